@@ -4,7 +4,7 @@ import streamlit as st
 # Page info
 st.set_page_config(page_title="OpenCourse", page_icon="https://raw.githubusercontent.com/teaghan/playlab-courses/main/images/favicon.png", layout="wide")
 
-from utils.core.config import open_config
+from utils.core.config import images_config
 from utils.data.session_manager import SessionManager as sm
 
 # If necessary, load tutor data, user data, styling, memory manager, etc.
@@ -40,7 +40,7 @@ if course_code:
 
 # Display logo
 col1, col2, col3 = st.columns((1,1,1))
-col2.image(open_config()['images']['logo_full'], use_container_width=True)
+col2.image(images_config().logo_full, use_container_width=True)
 
 st.markdown("----")  
 
@@ -0,0 +1,108 @@
+"""
+Load and latency benchmark of the AI path against the local Playlab stand-in.
+
+Runs concurrent simulated sessions, each sending a few messages through the same
+admission control, circuit breaker and streaming parser as the app, and reports
+time to first token, total response time, throughput and errors.
+
+Example:
+    python benchmark_ai.py --sessions 50 --turns 3 --latency 1.5 --token-rate 30 --failure-rate 0.05
+"""
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.ai.standin import StandinServer, StandinPlaylabApp, standin_settings
+from utils.ai.scheduler import LLMScheduler, PRIORITY_STUDENT
+from utils.ai.resilience import guarded_stream
+from utils.ai.response_parser import ResponseParser, stream_field
+
+PROJECT_KEY = 'student_assistant'
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+def run_session(server, scheduler, session, turns, results, lock):
+    """One simulated student: open a conversation, then send `turns` messages."""
+    try:
+        app = StandinPlaylabApp(project_id=PROJECT_KEY, base_url=server.url)
+    except Exception as e:
+        with lock:
+            results.append({'error': f"setup: {type(e).__name__}"})
+        return
+    for turn in range(turns):
+        stats = {}
+        parser = ResponseParser()
+        result = {}
+        start = time.perf_counter()
+        try:
+            with scheduler.slot(app.project_id, f"session-{session}", PRIORITY_STUDENT):
+                result['wait'] = time.perf_counter() - start
+                deltas = guarded_stream(app, f"Question {turn + 1} from session {session}", stats=stats)
+                for _ in stream_field(deltas, parser):
+                    pass
+            parser.close()
+            result['ttft'] = result['wait'] + stats.get('ttft', 0.0)
+            result['total'] = time.perf_counter() - start
+            result['parsed'] = 'message' in parser.fields
+        except Exception as e:
+            # Includes CircuitOpenError and QueueTimeout, as the app would show them
+            result['error'] = type(e).__name__
+        with lock:
+            results.append(result)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=20, help="Concurrent simulated sessions")
+    parser.add_argument('--turns', type=int, default=3, help="Messages sent per session")
+    parser.add_argument('--latency', type=float, default=None, help="Seconds before the first token")
+    parser.add_argument('--token-rate', type=float, default=None, help="Tokens streamed per second")
+    parser.add_argument('--failure-rate', type=float, default=None, help="Fraction of requests failing with HTTP 500")
+    parser.add_argument('--max-in-flight', type=int, default=8, help="Concurrent requests admitted per project")
+    parser.add_argument('--queue-timeout', type=float, default=120, help="Seconds a request may wait for a slot")
+    args = parser.parse_args()
+
+    # Canned responses come from config/standin.yaml; the benchmark runs its own server on a free port
+    settings = standin_settings()
+    settings['port'] = 0
+    for key in ('latency', 'token_rate', 'failure_rate'):
+        if getattr(args, key) is not None:
+            settings[key] = getattr(args, key)
+    server = StandinServer(**settings)
+    server.start()
+    scheduler = LLMScheduler(max_in_flight=args.max_in_flight, queue_timeout=args.queue_timeout)
+
+    results, lock = [], threading.Lock()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions) as executor:
+        for session in range(args.sessions):
+            executor.submit(run_session, server, scheduler, session, args.turns, results, lock)
+    elapsed = time.perf_counter() - start
+    server.stop()
+
+    completed = [r for r in results if 'error' not in r]
+    errors = {}
+    for r in results:
+        if 'error' in r:
+            errors[r['error']] = errors.get(r['error'], 0) + 1
+    ttft = [r['ttft'] for r in completed]
+    total = [r['total'] for r in completed]
+    wait = [r['wait'] for r in completed]
+
+    print(f"Sessions: {args.sessions}, turns: {args.turns}, max in flight: {args.max_in_flight}, "
+          f"latency: {server.latency}s, token rate: {server.token_rate}/s, failure rate: {server.failure_rate}")
+    print(f"Completed: {len(completed)}/{len(results)} in {elapsed:.1f}s "
+          f"({len(completed) / elapsed:.2f} responses/s)")
+    print(f"Parsed: {sum(r['parsed'] for r in completed)}/{len(completed)}")
+    print(f"Queue wait   p50 {percentile(wait, 0.5):.2f}s  p95 {percentile(wait, 0.95):.2f}s")
+    print(f"First token  p50 {percentile(ttft, 0.5):.2f}s  p95 {percentile(ttft, 0.95):.2f}s")
+    print(f"Total        p50 {percentile(total, 0.5):.2f}s  p95 {percentile(total, 0.95):.2f}s")
+    if errors:
+        print("Errors: " + ", ".join(f"{name} x{count}" for name, count in sorted(errors.items())))
+
+if __name__ == "__main__":
+    main()
@@ -9,8 +9,9 @@ st.set_page_config(page_title="Edit Section",
 from utils.frontend.menu import menu
 from utils.data.session_manager import SessionManager as sm
 from utils.data.aws import update_section, update_section_assistant
-from utils.frontend.playlab import display_conversation, moderate_content
-from utils.core.config import open_config
+from utils.frontend.playlab import display_conversation
+from utils.ai.moderation_queue import submit_section_moderation
+from utils.core.config import playlab_config
 from utils.core.error_handling import catch_error
 from utils.frontend.assistants import display_assistant_selection
 
@@ -65,42 +66,46 @@ section_overview = st.text_area(
 selected_assistant_id = display_assistant_selection(course_code, section)
 
 success_banner = st.empty()
-st.session_state.moderator_spinner = st.container()
 
 # Save button
 if st.button("Save Section", type="primary", use_container_width=True):
 
 
     try:
-        # Moderator
-        is_appropriate, feedback = moderate_content(section_title, 
-                                                    section_type='content')
-        if not is_appropriate:
-            success_banner.error(f'Your section could not be saved. {feedback}')
-        else:
-            if update_section(
+        content = st.session_state.get('editor_content') or ''
+        if not content.strip():
+            success_banner.error('Your section could not be saved. Error: No content found to moderate')
+        elif update_section(
+            course_code=course_code,
+            unit_id=unit_id,
+            section_id=section.id,
+            title=section_title,
+            overview=section_overview,
+            content=content
+        ):
+            # Update the assistant for this section
+            if update_section_assistant(
                 course_code=course_code,
                 unit_id=unit_id,
                 section_id=section.id,
-                title=section_title,
-                overview=section_overview,
-                content=st.session_state.get('editor_content')
+                assistant_id=selected_assistant_id
             ):
-                # Update the assistant for this section
-                if update_section_assistant(
-                    course_code=course_code,
-                    unit_id=unit_id,
-                    section_id=section.id,
-                    assistant_id=selected_assistant_id
-                ):
+                # Content is reviewed in the background; the verdict arrives as a notification
+                status, feedback = submit_section_moderation(course_code, unit_id, section.id, section_title,
+                                                             section_type='content', content=content)
+                if status == 'rejected':
+                    success_banner.warning(f'Your section was saved but is hidden from students. {feedback}')
+                elif status == 'pending':
+                    success_banner.success("Section saved and visible to students! It is being reviewed and will be hidden if it does not pass.")
+                else:
                     success_banner.success("Section updated successfully!")
-                    page_header.empty()
-                    page_header.markdown(f"<h1 style='text-align: center; color: grey;'>{section_title}</h1>", unsafe_allow_html=True)
+                page_header.empty()
+                page_header.markdown(f"<h1 style='text-align: center; color: grey;'>{section_title}</h1>", unsafe_allow_html=True)
 
-                else:
-                    catch_error()
             else:
                 catch_error()
+        else:
+            catch_error()
     except Exception as e:
         catch_error()
 
@@ -109,7 +114,7 @@ col1, col2 = st.columns([1, 1])
 with col1:
     st.markdown('### Assistant')
     with st.container(height=650):
-        response = display_conversation(open_config()['playlab']['section_editor'], user='teacher', section_title=section_title)
+        response = display_conversation(playlab_config().section_editor, user='teacher', section_title=section_title)
 
 # Section Editor
 with col2:
@@ -2,7 +2,7 @@ import streamlit as st
 from utils.data.session_manager import SessionManager as sm
 from utils.data.aws import get_course_details
 from utils.core.error_handling import catch_error
-from utils.core.config import open_config
+from utils.core.config import images_config
 st.set_page_config(
     page_title="Enter Course Code",
     page_icon="https://raw.githubusercontent.com/teaghan/playlab-courses/main/images/favicon.png",
@@ -14,7 +14,7 @@ sm.check_state(check_user=False)
 
 # Display logo
 col1, col2, col3 = st.columns((1,1,1))
-col2.image(open_config()['images']['logo_full'], use_container_width=True)
+col2.image(images_config().logo_full, use_container_width=True)
 st.markdown("#")
 
 # Create a form for course code input
@@ -2,7 +2,7 @@ import streamlit as st
 from utils.data.session_manager import SessionManager as sm
 from utils.frontend.display_courses import explore_courses
 from utils.core.error_handling import catch_error
-from utils.core.config import open_config
+from utils.core.config import images_config
 
 # Streamlit info
 st.set_page_config(page_title='Explore Open Courses', 
@@ -19,7 +19,7 @@ try:
     if st.session_state.role=='student':
         # Display logo
         col1, col2, col3 = st.columns((1,1,1))
-        col2.image(open_config()['images']['logo_full'], use_container_width=True)
+        col2.image(images_config().logo_full, use_container_width=True)
         st.markdown("----")
 
     # Display courses
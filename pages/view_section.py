@@ -16,6 +16,7 @@ from utils.core.error_handling import catch_error
 from utils.frontend.download_section import download_dialog
 from utils.frontend.student_assistant import display_student_assistant
 from utils.frontend.menu import menu
+from utils.data.prefetch import prefetch_neighbours
 
 # Get section ID from query params
 params = st.query_params
@@ -42,6 +43,13 @@ section = st.session_state.get("section")
 if section is None:
     st.switch_page('pages/enter_course.py')
 
+# Sections rejected by moderation are not shown to students
+if section.moderation_status == 'rejected':
+    st.info("This section is currently unavailable.")
+    if st.columns((1, 3))[0].button('Return to Course', use_container_width=True, type='primary'):
+        st.switch_page('pages/view_course.py')
+    st.stop()
+
 # Navigation
 if st.columns((1, 3))[0].button('Return to Course', use_container_width=True, type='primary'):
     st.switch_page('pages/view_course.py')
@@ -62,7 +70,8 @@ if section.section_type == 'content':
         display_student_assistant()
     st.markdown(section.content or '', unsafe_allow_html=True)
 elif section.section_type == 'file':
-    if st.session_state.get('pdf_content'):
+    pdf_content = sm.get_pdf_content()
+    if pdf_content:
         # Add download button
         if st.columns((3,1))[1].button("Download PDF", use_container_width=True, type="secondary"):
             # Sanitize the section title for use as a filename
@@ -72,7 +81,7 @@ elif section.section_type == 'file':
             # Create temporary file only when downloading
             try:
                 with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf', prefix=f"{safe_title}_") as tmp_file:
-                    tmp_file.write(st.session_state.pdf_content)
+                    tmp_file.write(pdf_content)
                     tmp_path = tmp_file.name
                     try:
                         download_dialog(
@@ -93,9 +102,12 @@ elif section.section_type == 'file':
             display_student_assistant()
         # Display PDF
         try:
-            pdf_viewer(st.session_state.pdf_content)
+            pdf_viewer(pdf_content)
         except Exception as e:
             catch_error()
             st.error("Error displaying PDF")
     else:
-        st.error("File content not found") 
\ No newline at end of file
+        st.error("File content not found")
+
+# Load the previous and next sections in the background
+prefetch_neighbours()
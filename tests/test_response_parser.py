@@ -0,0 +1,84 @@
+import threading
+
+from utils.ai.response_parser import ResponseParser, stream_field, parse_response
+
+def feed_in_chunks(text, size, stream_key='message'):
+    parser = ResponseParser(stream_key=stream_key)
+    streamed = ''.join(parser.feed(text[i:i + size]) for i in range(0, len(text), size))
+    parser.close()
+    return parser, streamed
+
+def test_parses_fields():
+    text = '{\n    "message": """Hello "there"!""",\n    "content": """# Title\n\nBody"""\n}'
+    assert parse_response(text) == {'message': 'Hello "there"!', 'content': '# Title\n\nBody'}
+
+def test_streams_message_across_chunk_boundaries():
+    text = '{"message": """Some ""quoted"" text""", "content": """x"""}'
+    for size in (1, 2, 3, 5, len(text)):
+        parser, streamed = feed_in_chunks(text, size)
+        assert streamed == 'Some ""quoted"" text'
+        assert parser.fields == {'message': 'Some ""quoted"" text', 'content': 'x'}
+        assert parser.malformed is None
+
+def test_ignores_text_after_the_object():
+    assert parse_response('{"message": """a"""}\n\n```') == {'message': 'a'}
+
+def test_ignores_trailing_code_fence_without_closing_brace():
+    parser, _ = feed_in_chunks('{"message": """a"""\n\n```', 1)
+    assert parser.fields == {'message': 'a'}
+    assert parser.malformed is None
+
+def test_ignores_preamble_with_quotes():
+    text = 'Sure! Here is "my" answer:\n{"message": """hi""", "content": """c"""}'
+    parser, streamed = feed_in_chunks(text, 4)
+    assert parser.malformed is None
+    assert streamed == 'hi'
+    assert parser.fields == {'message': 'hi', 'content': 'c'}
+
+def test_ignores_code_fence_preamble():
+    assert parse_response('```json\n{"message": """hi"""}\n```') == {'message': 'hi'}
+
+def test_keeps_completed_fields_when_later_part_is_malformed():
+    parser, _ = feed_in_chunks('{"message": """hi""", "content": "not triple quoted"}', 3)
+    assert parser.malformed
+    assert parser.fields == {'message': 'hi'}
+
+def test_keeps_completed_fields_when_last_value_is_unclosed():
+    parser, _ = feed_in_chunks('{"message": """hi""", "content": """cut off', 3)
+    assert parser.malformed
+    assert parser.fields == {'message': 'hi'}
+
+def test_fails_without_opening_brace():
+    parser, _ = feed_in_chunks('x' * 300, 50)
+    assert parser.malformed
+    assert parser.fields == {}
+
+def test_fails_on_text_inside_object_before_any_field():
+    parser, _ = feed_in_chunks('{ oops "message": """hi"""}', 4)
+    assert parser.malformed
+    assert parser.fields == {}
+
+def test_stream_field_stops_reading_when_malformed():
+    read = []
+    def deltas():
+        for delta in ['{"message": """hi""", ', '"content": "bad', '", more', ' text']:
+            read.append(delta)
+            yield delta
+    parser = ResponseParser()
+    assert ''.join(stream_field(deltas(), parser)) == 'hi'
+    assert parser.malformed
+    assert parser.fields == {'message': 'hi'}
+    assert len(read) == 2
+
+def test_stream_field_stops_reading_when_cancelled():
+    cancel = threading.Event()
+    read = []
+    def deltas():
+        for delta in ['{"assessment": """app', 'ropriate""", ', '"feedback": """', 'more']:
+            read.append(delta)
+            if len(read) == 2:
+                cancel.set()
+            yield delta
+    parser = ResponseParser(stream_key=None)
+    assert list(stream_field(deltas(), parser, cancel)) == []
+    assert len(read) == 2
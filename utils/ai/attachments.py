@@ -0,0 +1,75 @@
+import io
+from typing import List, Optional
+
+import streamlit as st
+
+from utils.core.logger import logger
+from utils.data.aws import file_key, get_file_content, get_file_etag
+from utils.data.cache_backend import shared_cache
+
+# Constants
+ATTACHMENT_TTL = 86400  # 24 hours (entries are keyed by ETag, so a replaced file never hits a stale entry)
+MIN_PAGE_TEXT = 20  # Average extracted characters per page below which a PDF is treated as scanned
+MAX_ATTACHMENT_CHARS = 150000  # Longer documents are uploaded as a file instead
+ATTACHMENT_SCOPE = 'attachments'  # Cache scope no write invalidates, as entries are keyed by S3 key and ETag
+
+def extract_pdf_pages(file_content: bytes, max_pages: Optional[int] = None) -> Optional[List[str]]:
+    """
+    Extract the text of each page of a PDF.
+
+    Args:
+        file_content (bytes): PDF bytes
+        max_pages (int, optional): Return None without extracting if the PDF has at most this many pages
+
+    Returns:
+        list: Text of each page, or None if the text cannot be extracted
+            (pypdf not installed, unreadable or scanned PDF)
+    """
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return None
+    try:
+        reader = PdfReader(io.BytesIO(file_content))
+        if max_pages is not None and len(reader.pages) <= max_pages:
+            return None
+        pages = [page.extract_text() or '' for page in reader.pages]
+    except Exception as e:
+        logger.warning(f"Could not extract PDF text: {e}")
+        return None
+    if not pages or sum(len(text.strip()) for text in pages) < MIN_PAGE_TEXT * len(pages):
+        return None
+    return pages
+
+@st.cache_data(ttl=ATTACHMENT_TTL, show_spinner=False)
+@shared_cache(ttl=ATTACHMENT_TTL, scope=ATTACHMENT_SCOPE)
+def _document_text(s3_key: str, etag: str) -> Optional[str]:
+    """Extracted text of one version of a PDF, shared by every session and worker process."""
+    file_content = get_file_content(s3_key)
+    if not file_content:
+        return None
+    pages = extract_pdf_pages(file_content)
+    if pages is None:
+        return None
+    text = '\n\n'.join(f"[Page {i + 1}]\n{page}" for i, page in enumerate(pages))
+    if len(text) > MAX_ATTACHMENT_CHARS:
+        return None
+    logger.info(f"Extracted {len(text)} characters from {s3_key} ({etag})")
+    return text
+
+def get_attachment_text(file_path: str) -> Optional[str]:
+    """
+    Get a section PDF as text to send in place of the file.
+
+    The text is extracted once per document version (S3 key and ETag), so the PDF
+    is not re-uploaded to Playlab for every student conversation.
+
+    Returns:
+        str: The document text, or None if the PDF has to be uploaded as a file
+    """
+    if not file_path:
+        return None
+    etag = get_file_etag(file_path)
+    if etag is None:
+        return None
+    return _document_text(file_key(file_path), etag)
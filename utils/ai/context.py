@@ -0,0 +1,81 @@
+import difflib
+import hashlib
+from typing import Dict, Optional
+
+import streamlit as st
+
+# Constants
+DIFF_CONTEXT_LINES = 2  # Unchanged lines shown around each change in a diff
+MAX_DIFF_RATIO = 0.6  # Send the full block instead when the diff is larger than this fraction of it
+
+def get_conversation_context(app) -> 'ConversationContext':
+    """
+    Get the session's conversation context for the current Playlab client.
+    A new conversation (reset chat, new model) starts with an empty context.
+    """
+    conversation_id = getattr(app, 'conversation_id', None)
+    context = st.session_state.get('conversation_context')
+    if context is None or context.conversation_id != conversation_id:
+        context = ConversationContext(conversation_id)
+        st.session_state['conversation_context'] = context
+    return context
+
+def content_hash(text: str) -> str:
+    """Short reference to a version of a context block."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:12]
+
+# ---------------------------- ConversationContext Implementation ----------------------------
+class ConversationContext:
+    def __init__(self, conversation_id: Optional[str] = None):
+        """
+        Tracks which version of each large context block (the editor content, the template)
+        the assistant has already seen in a conversation, so a block is sent in full once
+        and afterwards only as a diff, or as a reference when it is unchanged.
+
+        Blocks rendered for a message are pending until `commit` is called once the
+        assistant has responded; `reset` forgets everything if delivery is uncertain.
+        """
+        self.conversation_id = conversation_id
+        self.seen: Dict[str, str] = {}
+        self.pending: Dict[str, str] = {}
+
+    def render(self, name: str, text: str) -> str:
+        """
+        Get the value to send for a context block.
+
+        Args:
+            name (str): Block name, e.g. 'content'
+            text (str): Current version of the block
+
+        Returns:
+            str: The full block, a diff against the version the assistant last saw, or an unchanged marker
+        """
+        text = text or ''
+        self.pending[name] = text
+        previous = self.seen.get(name)
+        if previous is None:
+            return text
+        if previous == text:
+            return f"[Unchanged since the last message (ref {content_hash(text)})]"
+
+        diff = ''.join(difflib.unified_diff(
+            previous.splitlines(keepends=True), text.splitlines(keepends=True),
+            fromfile=content_hash(previous), tofile=content_hash(text), n=DIFF_CONTEXT_LINES
+        ))
+        if len(diff) > MAX_DIFF_RATIO * len(text):
+            return text
+        return f"[Changes since the last message (ref {content_hash(previous)} -> {content_hash(text)}), as a unified diff]\n{diff}"
+
+    def commit(self):
+        """Record the blocks of the last message as seen by the assistant."""
+        self.seen.update(self.pending)
+        self.pending = {}
+
+    def mark_seen(self, name: str, text: str):
+        """Record a block version the assistant produced itself, e.g. the content it returned."""
+        self.seen[name] = text or ''
+
+    def reset(self):
+        """Forget what the assistant has seen so the next message carries the full context."""
+        self.seen = {}
+        self.pending = {}
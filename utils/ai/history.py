@@ -0,0 +1,68 @@
+import re
+from typing import List, Optional
+
+from utils.core.config import open_config
+
+# Defaults (overridden by config/memory.yaml)
+CHAT_RENDER_WINDOW = 12  # Most recent messages rendered in full
+CHAT_MAX_MESSAGES = 40  # Messages kept per session before older ones are folded into the summary
+SUMMARY_MAX_LINES = 30  # Oldest summary lines are dropped beyond this
+SNIPPET_CHARS = 160  # Length of each message's summary line
+
+ROLE_NAMES = {'user': 'Student', 'assistant': 'Assistant'}
+
+def history_limits():
+    """Return (render window, max messages) from config/memory.yaml."""
+    config = open_config().get('memory', {})
+    window = config.get('chat_render_window', CHAT_RENDER_WINDOW)
+    max_messages = max(config.get('chat_max_messages', CHAT_MAX_MESSAGES), window)
+    return window, max_messages
+
+def summarize_message(message: dict) -> str:
+    """Extractive one-line summary of a chat message: its first sentence, shortened."""
+    text = re.sub(r'\s+', ' ', re.sub(r'[#*_`>$]', '', message.get('content') or '')).strip()
+    first_sentence = re.split(r'(?<=[.!?])\s', text, maxsplit=1)[0]
+    if len(first_sentence) > SNIPPET_CHARS:
+        first_sentence = first_sentence[:SNIPPET_CHARS].rsplit(' ', 1)[0] + '…'
+    return f"{ROLE_NAMES.get(message.get('role'), 'Assistant')}: {first_sentence}"
+
+def fold_history(session_state, keep: Optional[int] = None) -> bool:
+    """
+    Fold older chat messages into the session's summary, keeping only the most recent.
+
+    Args:
+        session_state: Streamlit session state
+        keep (int, optional): Messages to keep. By default, messages are folded
+            down to the render window once the session exceeds its message cap.
+
+    Returns:
+        bool: True if any messages were folded
+    """
+    messages = session_state.get('messages') or []
+    window, max_messages = history_limits()
+    if keep is None:
+        if len(messages) <= max_messages:
+            return False
+        keep = window
+    if len(messages) <= keep:
+        return False
+
+    folded, session_state['messages'] = messages[:-keep], messages[-keep:]
+    summary = (session_state.get('chat_summary') or []) + [summarize_message(m) for m in folded]
+    session_state['chat_summary'] = summary[-SUMMARY_MAX_LINES:]
+    # The Playlab conversation is restarted from the summary on the next turn
+    session_state['rotate_conversation'] = True
+    return True
+
+def history_summary(session_state, window: int) -> List[str]:
+    """Summary lines for every message not rendered in full."""
+    messages = session_state.get('messages') or []
+    older = messages[:-window] if len(messages) > window else []
+    return (session_state.get('chat_summary') or []) + [summarize_message(m) for m in older]
+
+def history_transcript(session_state) -> str:
+    """Summary of folded messages followed by the kept messages, for seeding a new conversation."""
+    lines = list(session_state.get('chat_summary') or [])
+    for message in (session_state.get('messages') or [])[:-1]:
+        lines.append(f"{ROLE_NAMES.get(message['role'], 'Assistant')}: {message['content']}")
+    return '\n'.join(lines)
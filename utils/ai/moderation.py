@@ -0,0 +1,275 @@
+import re
+import tempfile
+import time
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional, Tuple
+
+from utils.core.config import playlab_config
+from utils.core.logger import logger
+from utils.ai.playlab_pool import get_playlab_pool
+from utils.ai.response_parser import ResponseParser, stream_field
+from utils.ai.resilience import backoff_delay, CircuitOpenError
+from utils.ai.scheduler import scheduled_stream, QueueTimeout, PRIORITY_MODERATOR
+from utils.ai.moderation_cache import get_moderation_cache, moderation_key
+from utils.ai.attachments import extract_pdf_pages
+from utils.ai.payload import render_payload
+from utils.ai.telemetry import get_telemetry, CallRecord
+
+# Constants
+CHUNK_CHARS = 8000  # Target maximum size of a moderated chunk
+PDF_PAGES_PER_CHUNK = 10  # Maximum pages per moderated PDF chunk
+CHUNK_WORKERS = 4  # Chunks moderated concurrently per section
+
+UNAVAILABLE_MESSAGE = "AI moderation is currently unavailable due to API access issues. Please try again later."
+BUSY_MESSAGE = "AI moderation is currently busy. The section will be reviewed shortly."
+
+def moderation_prompt(content: str, section_title: str = '', course_name: str = '', grade_level='', unit_title: str = '') -> str:
+    """Build the moderator message for a section."""
+    return render_payload((
+        ('course_name', course_name),
+        ('student_grade', grade_level),
+        ('unit_title', unit_title),
+        ('module_title', section_title),
+        ('content', content)
+    ))
+
+def split_content(content: str, max_chars: int = CHUNK_CHARS) -> List[Tuple[str, str]]:
+    """
+    Split section content into semantically bounded chunks: on headings first, then on
+    paragraphs for sections that are still too long. Consecutive pieces are packed together
+    up to `max_chars`.
+
+    Returns:
+        list: (label, text) pairs
+    """
+    pieces = []
+    for block in re.split(r'\n(?=#{1,6}\s)', content):
+        if len(block) <= max_chars:
+            pieces.append(block)
+            continue
+        for paragraph in re.split(r'\n\s*\n', block):
+            # Paragraphs longer than a chunk are split at the limit
+            pieces.extend(paragraph[i:i + max_chars] for i in range(0, len(paragraph), max_chars))
+
+    chunks = []
+    for piece in pieces:
+        if chunks and len(chunks[-1]) + len(piece) + 2 <= max_chars:
+            chunks[-1] += '\n\n' + piece
+        elif piece.strip():
+            chunks.append(piece)
+    return [(f"part {i + 1} of {len(chunks)}", chunk) for i, chunk in enumerate(chunks)]
+
+def split_pdf(file_content: bytes, pages_per_chunk: int = PDF_PAGES_PER_CHUNK,
+              max_chars: int = CHUNK_CHARS) -> Optional[List[Tuple[str, str]]]:
+    """
+    Split a long PDF into page ranges of extracted text.
+
+    Returns:
+        list: (label, text) pairs, or None if the PDF should be sent as a file: it fits
+            in one chunk (so images are moderated too) or its text cannot be extracted
+            (pypdf not installed, unreadable or scanned PDF)
+    """
+    pages = extract_pdf_pages(file_content, max_pages=pages_per_chunk)
+    if pages is None:
+        return None
+
+    chunks = []
+    start = 0
+    while start < len(pages):
+        end = start + 1
+        size = len(pages[start])
+        while end < len(pages) and end - start < pages_per_chunk and size + len(pages[end]) <= max_chars:
+            size += len(pages[end])
+            end += 1
+        label = f"page {start + 1}" if end - start == 1 else f"pages {start + 1}-{end}"
+        chunks.append((label, '\n\n'.join(pages[start:end])))
+        start = end
+    return chunks
+
+def _moderate_once(project_id: str, prompt: str, file_content: Optional[bytes] = None, max_retries: int = 3,
+                   cancel: Optional[threading.Event] = None) -> Tuple[Optional[bool], str]:
+    """
+    Send one moderation request, retrying unclear responses.
+
+    Returns:
+        tuple: (True, '') if appropriate, (False, feedback) if inappropriate,
+               or (None, error) if no definite verdict was reached
+    """
+    moderator_app = get_playlab_pool().acquire(project_id)
+    if moderator_app is None:
+        return None, UNAVAILABLE_MESSAGE
+
+    call = CallRecord(project_id, 'moderator')
+    start = time.perf_counter()
+    try:
+        for attempt in range(max_retries):
+            call.retries = attempt
+            if cancel is not None and cancel.is_set():
+                call.error = 'Cancelled'
+                return None, "Cancelled"
+            try:
+                logger.debug('MODERATOR PROMPT:\n\n%s\n\n', prompt)
+                parser = ResponseParser(stream_key=None)
+                stats = {}
+                if file_content is not None:
+                    with tempfile.NamedTemporaryFile(delete=True, suffix='.pdf') as tmp_file:
+                        tmp_file.write(file_content)
+                        tmp_file.flush()  # Ensure all data is written
+                        deltas = scheduled_stream(moderator_app, prompt, file_path=tmp_file.name,
+                                                  priority=PRIORITY_MODERATOR, client_id='moderation', stats=stats)
+                        for _ in stream_field(deltas, parser, cancel):
+                            pass
+                else:
+                    deltas = scheduled_stream(moderator_app, prompt, priority=PRIORITY_MODERATOR,
+                                              client_id='moderation', stats=stats)
+                    for _ in stream_field(deltas, parser, cancel):
+                        pass
+                call.attempt(prompt, parser.text, stats)
+                if cancel is not None and cancel.is_set():
+                    call.error = 'Cancelled'
+                    return None, "Cancelled"
+                if file_content is not None:
+                    call.request_bytes += len(file_content)
+                call.error = ''
+                logger.debug('MODERATOR RESPONSE:\n\n%s\n\n', parser.text)
+
+                # Required fields are parsed as the response streams in; a malformed response is abandoned early,
+                # keeping the fields completed before it went wrong
+                if parser.malformed:
+                    logger.warning(f'Malformed moderator response: {parser.malformed}')
+                parsed = parser.fields
+                logger.debug('MODERATOR PARSED RESPONSE:\n\n%s\n\n', parsed)
+                if not parsed.get('assessment'):
+                    if attempt == max_retries - 1:
+                        return None, "Error: Could not get clear assessment from moderator"
+                    continue
+
+                call.parsed = True
+                if 'inappropriate' in parsed['assessment'].lower():
+                    return False, parsed.get('feedback', 'Content was found to be inappropriate')
+                return True, ""
+
+            except CircuitOpenError as e:
+                call.error = type(e).__name__
+                return None, UNAVAILABLE_MESSAGE
+            except QueueTimeout as e:
+                # No slot freed up in time: no verdict, the queue runs the job again later
+                call.error = type(e).__name__
+                return None, BUSY_MESSAGE
+            except Exception as e:
+                call.error = type(e).__name__
+                if attempt == max_retries - 1:
+                    traceback.print_exc()
+                    logger.error(f"Error in moderation attempt {attempt + 1}: {str(e)}")
+                    return None, f"Error during moderation: {str(e)}"
+                time.sleep(backoff_delay(attempt))
+        return None, "Error: Could not get clear assessment from moderator"
+    finally:
+        call.latency = time.perf_counter() - start
+        get_telemetry().record(call)
+
+def run_moderation(section_title: str, section_type: str = 'content', content: Optional[str] = None,
+                   file_content: Optional[bytes] = None, course_name: str = '', grade_level='',
+                   unit_title: str = '', max_retries: int = 3) -> Tuple[Optional[bool], str]:
+    """
+    Moderate a section's content for appropriateness using the moderator model.
+    Takes all of its context as arguments, so it can run outside of a Streamlit session.
+
+    Long content is split into chunks (PDFs into page ranges of extracted text) that are
+    moderated concurrently, stopping at the first inappropriate chunk. PDFs without
+    extractable text are sent as a file.
+
+    Args:
+        section_title (str): Title of the section being moderated
+        section_type (str): Type of section ('content' or 'file')
+        content (str, optional): Section content for content sections
+        file_content (bytes, optional): PDF bytes for file sections
+        course_name (str): Name of the course
+        grade_level: Grade level of the course
+        unit_title (str): Title of the section's unit
+        max_retries (int): Maximum number of retries for failed attempts
+
+    Returns:
+        tuple: (True, '') if the content is appropriate, (False, feedback) if it is not,
+               or (None, error) if no verdict was reached and moderation should be retried
+    """
+    try:
+        try:
+            project_id = playlab_config().section_moderator
+        except KeyError as e:
+            logger.error(f"Moderation not configured: {e}")
+            return None, "Configuration error: Missing moderator settings"
+
+        moderated = file_content if section_type == 'file' else content
+        if not moderated or (section_type != 'file' and not content.strip()):
+            return False, "Error: No content found to moderate"
+
+        # Previously approved content is not sent to the model again
+        cache = get_moderation_cache()
+        cache_key = moderation_key(moderated, grade_level)
+        verdict = cache.get(cache_key)
+        if verdict is not None:
+            logger.info(f'Reusing moderation verdict {cache_key[:12]}')
+            return verdict
+
+        chunks = split_pdf(file_content) if section_type == 'file' else split_content(content)
+        if not chunks:
+            # Short or scanned PDF: the moderator reads the file itself
+            prompt = moderation_prompt("The content is attached as a PDF file to this message.",
+                                       section_title, course_name, grade_level, unit_title)
+            is_appropriate, feedback = _moderate_once(project_id, prompt, file_content, max_retries)
+        else:
+            is_appropriate, feedback = _moderate_chunks(project_id, chunks, section_title, course_name,
+                                                        grade_level, unit_title, max_retries)
+
+        if is_appropriate is None:
+            # No definite verdict, including an unavailable moderator: the section stays pending and is retried
+            return None, feedback
+        cache.put(cache_key, is_appropriate, feedback)
+        return is_appropriate, feedback
+
+    except Exception as e:
+        logger.error(f"Critical error in content moderation: {str(e)}")
+        return None, f"Critical error during moderation: {str(e)}"
+
+def _moderate_chunks(project_id: str, chunks: List[Tuple[str, str]], section_title: str, course_name: str,
+                     grade_level, unit_title: str, max_retries: int) -> Tuple[Optional[bool], str]:
+    """Moderate chunks concurrently, short-circuiting on the first inappropriate one."""
+    cache = get_moderation_cache()
+    cancel = threading.Event()
+
+    def moderate_chunk(label: str, text: str) -> Tuple[Optional[bool], str]:
+        # Unchanged chunks of an edited document keep their approvals
+        chunk_key = moderation_key(text, grade_level)
+        verdict = cache.get(chunk_key)
+        if verdict is not None:
+            return verdict
+        title = section_title if len(chunks) == 1 else f"{section_title} ({label})"
+        prompt = moderation_prompt(text, title, course_name, grade_level, unit_title)
+        is_appropriate, feedback = _moderate_once(project_id, prompt, max_retries=max_retries, cancel=cancel)
+        if is_appropriate is not None:
+            cache.put(chunk_key, is_appropriate, feedback)
+        return is_appropriate, feedback
+
+    errors = []
+    executor = ThreadPoolExecutor(max_workers=min(CHUNK_WORKERS, len(chunks)), thread_name_prefix='moderation-chunk')
+    try:
+        futures = {executor.submit(moderate_chunk, label, text): label for label, text in chunks}
+        for future in as_completed(futures):
+            is_appropriate, feedback = future.result()
+            if is_appropriate is False:
+                # Stop the remaining chunks; running ones notice the cancel on their next delta
+                cancel.set()
+                label = futures[future]
+                return False, feedback if len(chunks) == 1 else f"In {label}: {feedback}"
+            if is_appropriate is None:
+                errors.append(feedback)
+    finally:
+        # Don't wait for chunks still running after a short-circuit
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if errors:
+        return None, errors[0]
+    return True, ""
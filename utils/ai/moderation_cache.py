@@ -0,0 +1,81 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple, Union
+
+import streamlit as st
+
+from utils.core.config import playlab_config
+from utils.core.logger import logger
+from utils.data.aws import get_moderation_verdict, put_moderation_verdict
+
+# Constants
+LOCAL_CACHE_SIZE = 512  # Verdicts kept in memory in front of DynamoDB
+
+@st.cache_resource(show_spinner=False)
+def get_moderation_cache():
+    """Singleton instance of ModerationCache."""
+    return ModerationCache()
+
+def moderator_prompt_version() -> str:
+    """Version of the moderator prompt. Bump it in config/playlab.yaml to re-moderate all content."""
+    return playlab_config().moderator_prompt_version
+
+def moderation_key(content: Union[str, bytes], grade_level: str = '', prompt_version: Optional[str] = None) -> str:
+    """
+    Hash identifying a moderation verdict.
+
+    Only what the verdict depends on is hashed: the content itself, the grade level it is
+    judged against and the moderator prompt version. Titles are not included, so renaming a
+    section keeps its verdict, and copies of a course inherit the verdicts of the original.
+    """
+    if prompt_version is None:
+        prompt_version = moderator_prompt_version()
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    digest = hashlib.sha256()
+    digest.update(f"v{prompt_version}|grade:{grade_level}|".encode('utf-8'))
+    digest.update(content)
+    return digest.hexdigest()
+
+# ---------------------------- ModerationCache Implementation ----------------------------
+class ModerationCache:
+    def __init__(self, size: int = LOCAL_CACHE_SIZE):
+        """
+        Approvals by content hash: a local LRU in front of the verdicts stored in DynamoDB.
+
+        Rejections are not kept, so content rejected by a false positive is moderated again
+        the next time it is submitted.
+        """
+        self.size = size
+        self.lock = threading.Lock()
+        self.local: OrderedDict[str, Tuple[bool, str]] = OrderedDict()
+
+    def _remember(self, key: str, verdict: Tuple[bool, str]):
+        with self.lock:
+            self.local[key] = verdict
+            self.local.move_to_end(key)
+            while len(self.local) > self.size:
+                self.local.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Tuple[bool, str]]:
+        """Return (True, feedback) for previously approved content, or None."""
+        with self.lock:
+            verdict = self.local.get(key)
+            if verdict is not None:
+                self.local.move_to_end(key)
+                return verdict
+        item = get_moderation_verdict(key)
+        if item is None or not item['approved']:
+            return None
+        verdict = (bool(item['approved']), item.get('feedback', ''))
+        self._remember(key, verdict)
+        return verdict
+
+    def put(self, key: str, is_appropriate: bool, feedback: str = ''):
+        """Store an approval locally and in DynamoDB. Rejections are ignored."""
+        if not is_appropriate:
+            return
+        self._remember(key, (is_appropriate, feedback))
+        if not put_moderation_verdict(key, is_appropriate, feedback, moderator_prompt_version()):
+            logger.warning(f"Moderation verdict {key[:12]} cached locally only")
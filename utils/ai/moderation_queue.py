@@ -0,0 +1,205 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import streamlit as st
+
+from utils.core.config import open_config
+from utils.core.logger import logger
+from utils.ai.moderation import run_moderation
+from utils.ai.moderation_cache import get_moderation_cache, moderation_key
+from utils.data.aws import (set_section_moderation, claim_section_moderation, get_pending_sections,
+                            get_course_bundle, get_file_content)
+
+# Constants
+MODERATION_WORKERS = 2  # Background threads running moderation jobs
+MODERATION_ATTEMPTS = 3  # Runs of a job without a verdict before the section is left pending
+RETRY_DELAY = 60  # 1 minute (wait before running a job again, doubling with each attempt)
+CLAIM_LEASE = 900  # 15 minutes (time after which a section claimed by another process may be moderated again)
+
+@st.cache_resource(show_spinner=False)
+def get_moderation_queue():
+    """Singleton instance of ModerationQueue. Sections left pending by a restart are queued again."""
+    workers = open_config()['playlab'].get('moderation_workers', MODERATION_WORKERS)
+    queue = ModerationQueue(workers)
+    threading.Thread(target=queue.resubmit_pending, name='moderation-recovery', daemon=True).start()
+    return queue
+
+def submit_section_moderation(course_code: str, unit_id: str, section_id: str, section_title: str,
+                              section_type: str = 'content', content: Optional[str] = None,
+                              file_content: Optional[bytes] = None) -> Tuple[str, str]:
+    """
+    Moderate a just-saved section in the background.
+
+    The section is marked as pending review and the verdict is applied when moderation
+    finishes; the editor is notified on their next rerun. Previously moderated content
+    gets its verdict immediately.
+
+    Returns:
+        tuple: (status, feedback) where status is 'pending', 'approved' or 'rejected'
+    """
+    job = ModerationJob(
+        course_code=course_code,
+        unit_id=unit_id,
+        section_id=section_id,
+        section_title=section_title,
+        section_type=section_type,
+        content=content,
+        file_content=file_content,
+        course_name=st.session_state.get('course_name', ''),
+        grade_level=st.session_state.get('grade_level', ''),
+        unit_title=getattr(st.session_state.get('section'), 'unit_title', ''),
+        user_email=st.session_state.get('user_email', '')
+    )
+    job.content_hash = moderation_key(file_content if section_type == 'file' else (content or ''), job.grade_level)
+
+    verdict = get_moderation_cache().get(job.content_hash)
+    if verdict is not None:
+        is_appropriate, feedback = verdict
+        status = 'approved' if is_appropriate else 'rejected'
+        set_section_moderation(course_code, unit_id, section_id, status, feedback, content_hash=job.content_hash)
+        return status, feedback
+
+    set_section_moderation(course_code, unit_id, section_id, 'pending', content_hash=job.content_hash)
+    get_moderation_queue().submit(job)
+    return 'pending', ''
+
+def show_moderation_notices():
+    """Notify the current user about moderation jobs that finished since their last rerun."""
+    user_email = st.session_state.get('user_email')
+    if not user_email:
+        return
+    for notice in get_moderation_queue().pop_notices(user_email):
+        if notice['status'] == 'approved':
+            st.toast(f"**{notice['section_title']}** passed review and is visible to students.", icon="✅")
+        elif notice['status'] == 'rejected':
+            st.toast(f"**{notice['section_title']}** is hidden from students. {notice['feedback']}", icon="⚠️")
+        else:
+            st.toast(f"**{notice['section_title']}** could not be reviewed yet and is still pending. "
+                     f"Save it again to retry.", icon="⏳")
+
+@dataclass
+class ModerationJob:
+    course_code: str
+    unit_id: str
+    section_id: str
+    section_title: str
+    section_type: str
+    content: Optional[str]
+    file_content: Optional[bytes]
+    course_name: str
+    grade_level: str
+    unit_title: str
+    user_email: str
+    content_hash: str = ''
+    attempts: int = 0
+
+# ---------------------------- ModerationQueue Implementation ----------------------------
+class ModerationQueue:
+    def __init__(self, workers: int = MODERATION_WORKERS):
+        """Process-wide pool running moderation jobs off the request path."""
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='moderation')
+        self.lock = threading.Lock()
+        self.notices: Dict[str, List[dict]] = {}
+
+    def submit(self, job: ModerationJob):
+        """Queue a job for moderation."""
+        logger.info(f"Queued moderation of section {job.section_id}")
+        return self.executor.submit(self._run, job)
+
+    def _run(self, job: ModerationJob):
+        """Moderate a section and apply the verdict, unless the section was saved again since."""
+        is_appropriate, feedback = run_moderation(
+            job.section_title,
+            section_type=job.section_type,
+            content=job.content,
+            file_content=job.file_content,
+            course_name=job.course_name,
+            grade_level=job.grade_level,
+            unit_title=job.unit_title
+        )
+        job.attempts += 1
+        if is_appropriate is None:
+            # No verdict (e.g. an unparseable response or a failed request): the section stays pending
+            if job.attempts < MODERATION_ATTEMPTS:
+                delay = RETRY_DELAY * 2 ** (job.attempts - 1)
+                logger.warning(f"Moderation of section {job.section_id} failed, retrying in {delay}s: {feedback}")
+                timer = threading.Timer(delay, self.submit, (job,))
+                timer.daemon = True
+                timer.start()
+                return
+            logger.error(f"Moderation of section {job.section_id} failed after {job.attempts} attempts: {feedback}")
+            self._notify(job, 'error', feedback)
+            return
+
+        status = 'approved' if is_appropriate else 'rejected'
+        applied = set_section_moderation(job.course_code, job.unit_id, job.section_id, status, feedback,
+                                         expected_hash=job.content_hash)
+        logger.info(f"Moderation of section {job.section_id}: {status}{'' if applied else ' (superseded)'}")
+        if applied:
+            self._notify(job, status, feedback)
+
+    def _notify(self, job: ModerationJob, status: str, feedback: str):
+        """Leave a notice for the editor who saved the section."""
+        if not job.user_email:
+            return
+        with self.lock:
+            self.notices.setdefault(job.user_email, []).append({
+                'section_title': job.section_title,
+                'status': status,
+                'feedback': feedback
+            })
+
+    def resubmit_pending(self):
+        """
+        Queue the sections still pending review. Their jobs only lived in the memory of
+        a process that has since stopped, so they would otherwise never be moderated.
+        Each section is claimed first, so sections another process is already moderating
+        are skipped.
+        """
+        sections = get_pending_sections()
+        bundles = {}
+        queued = 0
+        for section in sections:
+            try:
+                course_code = section['course_code']
+                if course_code not in bundles:
+                    bundles[course_code] = get_course_bundle(course_code) or {}
+                bundle = bundles[course_code]
+                unit = next((unit for unit in bundle.get('units', []) if unit['id'] == section['unit_id']), {})
+                section_type = section.get('section_type', 'content')
+                file_content = None
+                if section_type == 'file':
+                    file_content = get_file_content(section['file_path']) if section.get('file_path') else None
+                    if not file_content:
+                        continue
+                job = ModerationJob(
+                    course_code=course_code,
+                    unit_id=section['unit_id'],
+                    section_id=section['SK'].replace('SECTION#', ''),
+                    section_title=section.get('title', ''),
+                    section_type=section_type,
+                    content=section.get('content'),
+                    file_content=file_content,
+                    course_name=bundle.get('name', ''),
+                    grade_level=bundle.get('grade_level', ''),
+                    unit_title=unit.get('title', ''),
+                    user_email=''
+                )
+                job.content_hash = section.get('moderation_hash') or moderation_key(
+                    file_content if section_type == 'file' else (job.content or ''), job.grade_level)
+                if not claim_section_moderation(course_code, job.unit_id, job.section_id, CLAIM_LEASE,
+                                                content_hash=job.content_hash):
+                    continue
+                self.submit(job)
+                queued += 1
+            except Exception as e:
+                logger.error(f"Could not queue pending section {section.get('SK')}: {e}")
+        if sections:
+            logger.info(f"Queued {queued} of {len(sections)} sections left pending review")
+
+    def pop_notices(self, user_email: str) -> List[dict]:
+        """Take the finished-job notices for a user."""
+        with self.lock:
+            return self.notices.pop(user_email, [])
@@ -0,0 +1,57 @@
+import re
+from dataclasses import dataclass
+from typing import Tuple
+
+# Constants
+INDENT = '    '
+
+Fields = Tuple[Tuple[str, str], ...]
+
+def escape_value(value) -> str:
+    """
+    Make a value safe to place between triple quotes: quote runs inside the text and
+    a quote at its end would otherwise close the field early.
+    """
+    text = '' if value is None else str(value)
+    text = re.sub(r'"{3,}', lambda m: '\\"' * len(m.group()), text)
+    if text.endswith('"'):
+        text += ' '
+    return text
+
+def render_field(key: str, value) -> str:
+    return f'{INDENT}"{key}": """{escape_value(value)}"""'
+
+def render_payload(fields: Fields) -> str:
+    """Serialize (key, value) pairs into the triple-quoted message protocol."""
+    return '{\n' + ',\n'.join(render_field(key, value) for key, value in fields) + '\n}'
+
+# ---------------------------- PromptContext Implementation ----------------------------
+@dataclass(frozen=True)
+class PromptContext:
+    """
+    Fields of a prompt that stay the same across turns (course, section, instructions).
+
+    The fields are serialized deterministically and placed first in every payload, so
+    consecutive turns share the same prefix.
+    """
+    fields: Fields = ()
+
+    @property
+    def prefix(self) -> str:
+        return ',\n'.join(render_field(key, value) for key, value in self.fields)
+
+    def build(self, message: str, dynamic: Fields = ()) -> str:
+        """
+        Build a complete payload.
+
+        Args:
+            message (str): The user's message, sent last
+            dynamic (tuple): (key, value) pairs that change between turns (e.g. content diffs)
+
+        Returns:
+            str: The serialized payload
+        """
+        parts = [self.prefix] if self.fields else []
+        parts.extend(render_field(key, value) for key, value in dynamic)
+        parts.append(render_field('message', message))
+        return '{\n' + ',\n'.join(parts) + '\n}'
@@ -0,0 +1,115 @@
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Deque, Dict, Iterable, Optional, Tuple
+
+import streamlit as st
+
+from utils.core.config import open_config
+from utils.core.logger import logger
+from utils.ai.resilience import get_call_guard, guarded_call
+
+if TYPE_CHECKING:
+    from playlab_api import PlaylabApp
+
+# Constants
+POOL_SIZE = 2  # Warm clients kept ready per project
+MAX_CLIENT_AGE = 900  # 15 minutes (warm clients older than this are discarded)
+FAILURE_BACKOFF = 60  # 1 minute (pause refills for a project after a failed client setup)
+REFILL_WORKERS = 4  # Background threads creating clients
+PROJECT_KEYS = ['section_editor', 'student_assistant', 'section_moderator']
+
+@st.cache_resource(show_spinner=False)
+def get_playlab_pool():
+    """Singleton instance of PlaylabPool, pre-warmed for every project in config/playlab.yaml."""
+    config = open_config()['playlab']
+    pool = PlaylabPool(
+        size=config.get('pool_size', POOL_SIZE),
+        max_age=config.get('pool_max_client_age', MAX_CLIENT_AGE)
+    )
+    pool.warm(config[key] for key in PROJECT_KEYS if key in config)
+    return pool
+
+# ---------------------------- PlaylabPool Implementation ----------------------------
+class PlaylabPool:
+    def __init__(self, size: int = POOL_SIZE, max_age: int = MAX_CLIENT_AGE):
+        """
+        Process-wide pool of ready-to-use Playlab clients, keyed by project ID.
+
+        Creating a client opens a new conversation and fetches its initial message,
+        so clients are created ahead of time in the background. Each acquired client
+        is handed out once and never returned, keeping conversations isolated per session.
+        """
+        self.size = size
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.idle: Dict[str, Deque[Tuple[float, 'PlaylabApp']]] = {}
+        self.pending: Dict[str, int] = {}
+        self.failed_at: Dict[str, float] = {}
+        self.executor = ThreadPoolExecutor(max_workers=REFILL_WORKERS, thread_name_prefix='playlab-pool')
+
+    def _create(self, project_id: str) -> Optional['PlaylabApp']:
+        """Create a client with a fresh conversation, recording failures for backoff."""
+        # The client library is imported on first use, keeping it out of page start-up
+        from utils.ai.standin import playlab_client
+        try:
+            app = guarded_call(project_id, playlab_client(), project_id=project_id, verbose=False)
+            with self.lock:
+                self.failed_at.pop(project_id, None)
+            return app
+        except Exception as e:
+            logger.error(f"Playlab client setup failed for {project_id}: {e}")
+            with self.lock:
+                self.failed_at[project_id] = time.time()
+            return None
+
+    def _refill(self, project_id: str):
+        """Create one warm client in the background."""
+        try:
+            app = self._create(project_id)
+            if app is not None:
+                with self.lock:
+                    self.idle.setdefault(project_id, deque()).append((time.time(), app))
+        finally:
+            with self.lock:
+                self.pending[project_id] -= 1
+
+    def healthy(self, project_id: str) -> bool:
+        """False while the project is backing off after a failed client setup, or its circuit is open."""
+        failed_at = self.failed_at.get(project_id)
+        if failed_at is not None and time.time() - failed_at < FAILURE_BACKOFF:
+            return False
+        return get_call_guard().healthy(project_id)
+
+    def warm(self, project_ids: Iterable[str]):
+        """Schedule background creation of clients until each project has `size` ready or pending."""
+        for project_id in project_ids:
+            if not self.healthy(project_id):
+                continue
+            with self.lock:
+                ready = len(self.idle.get(project_id, ()))
+                pending = self.pending.get(project_id, 0)
+                missing = max(self.size - ready - pending, 0)
+                self.pending[project_id] = pending + missing
+            for _ in range(missing):
+                self.executor.submit(self._refill, project_id)
+
+    def acquire(self, project_id: str) -> Optional['PlaylabApp']:
+        """
+        Take a client for exclusive use, falling back to creating one if none is warm.
+
+        Returns:
+            PlaylabApp: A client with its own new conversation, or None if the API is unavailable
+        """
+        app = None
+        with self.lock:
+            idle = self.idle.get(project_id)
+            while idle and app is None:
+                created_at, candidate = idle.popleft()
+                if time.time() - created_at < self.max_age:
+                    app = candidate
+        self.warm([project_id])
+        if app is None:
+            app = self._create(project_id)
+        return app
@@ -0,0 +1,222 @@
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Deque, Dict, Iterator, Optional, Tuple
+
+import requests
+import streamlit as st
+
+from utils.core.config import open_config
+from utils.core.logger import logger
+from utils.ai.streaming import stream_deltas, DeadlineExceeded
+
+# Defaults (overridden by config/playlab.yaml)
+CALL_TIMEOUT = 90  # Seconds a call may take in total, including the streamed response
+CONNECT_TIMEOUT = 10  # Seconds to establish a connection
+READ_TIMEOUT = 30  # Seconds without any data from the server
+RETRY_BASE_DELAY = 1  # Seconds before the first retry, doubled for each further retry
+RETRY_MAX_DELAY = 10  # Longest delay between retries
+BREAKER_FAILURES = 5  # Consecutive failures that open a project's circuit
+BREAKER_RESET = 30  # Seconds an open circuit fails fast before letting a trial call through
+LATENCY_WINDOW = 200  # Recent call latencies kept per project for percentiles
+METRICS_LOG_EVERY = 50  # Log a project's metrics once every this many calls
+BLOCKING_WORKERS = 8  # Threads running blocking client calls under a deadline
+
+class CircuitOpenError(Exception):
+    """The Playlab project is failing; calls are rejected without being attempted."""
+
+@st.cache_resource(show_spinner=False)
+def get_call_guard():
+    """Singleton instance of CallGuard configured from config/playlab.yaml."""
+    config = open_config()['playlab']
+    return CallGuard(
+        call_timeout=config.get('call_timeout', CALL_TIMEOUT),
+        connect_timeout=config.get('connect_timeout', CONNECT_TIMEOUT),
+        read_timeout=config.get('read_timeout', READ_TIMEOUT),
+        breaker_failures=config.get('breaker_failures', BREAKER_FAILURES),
+        breaker_reset=config.get('breaker_reset', BREAKER_RESET)
+    )
+
+def backoff_delay(attempt: int, base: float = RETRY_BASE_DELAY, cap: float = RETRY_MAX_DELAY) -> float:
+    """Jittered exponential backoff: a random delay up to base * 2^attempt, capped."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+def guarded_stream(app, message: str, file_path: Optional[str] = None, stats: Optional[dict] = None) -> Iterator[str]:
+    """
+    stream_deltas behind the project's circuit breaker, with connect/read timeouts and
+    an overall deadline. Raises CircuitOpenError without calling the API while the
+    project is failing.
+    """
+    guard = get_call_guard()
+    project_id = app.project_id
+    trial = guard.before_call(project_id)
+    start = time.perf_counter()
+    ok = False
+    try:
+        yield from stream_deltas(app, message, file_path=file_path, stats=stats,
+                                 timeout=(guard.connect_timeout, guard.read_timeout),
+                                 deadline=time.monotonic() + guard.call_timeout)
+        ok = True
+    except GeneratorExit:
+        # The caller stopped reading (e.g. a malformed response); the API itself responded
+        ok = True
+        raise
+    except (requests.RequestException, DeadlineExceeded) as e:
+        logger.warning(f"Playlab call to {project_id} failed: {type(e).__name__}: {e}")
+        raise
+    finally:
+        guard.record(project_id, time.perf_counter() - start, ok, trial)
+
+def guarded_call(project_id: str, fn, *args, **kwargs):
+    """
+    Run a blocking client call (e.g. creating a PlaylabApp) behind the project's circuit
+    breaker and with the call deadline. On timeout the call is abandoned in its worker
+    thread and DeadlineExceeded is raised, so the calling session is not blocked.
+    """
+    guard = get_call_guard()
+    trial = guard.before_call(project_id)
+    start = time.perf_counter()
+    ok = False
+    try:
+        future = guard.executor.submit(fn, *args, **kwargs)
+        try:
+            result = future.result(timeout=guard.call_timeout)
+        except FutureTimeout:
+            raise DeadlineExceeded(f"Call to {project_id} not finished after {guard.call_timeout}s")
+        ok = True
+        return result
+    finally:
+        guard.record(project_id, time.perf_counter() - start, ok, trial)
+
+# ---------------------------- CircuitBreaker Implementation ----------------------------
+class CircuitBreaker:
+    def __init__(self, failures: int = BREAKER_FAILURES, reset: float = BREAKER_RESET):
+        """
+        Fails fast after `failures` consecutive failures. After `reset` seconds one trial
+        call is let through (half-open); its success closes the circuit, its failure reopens it.
+        """
+        self.failures = failures
+        self.reset = reset
+        self.consecutive = 0
+        self.opened_at: Optional[float] = None
+        self.trial_running = False
+
+    def allow(self) -> Tuple[bool, bool]:
+        """Returns (allowed, trial): whether a call may go ahead, and whether it is the half-open trial."""
+        if self.opened_at is None:
+            return True, False
+        if time.time() - self.opened_at >= self.reset and not self.trial_running:
+            self.trial_running = True
+            return True, True
+        return False, False
+
+    def record(self, ok: bool, trial: bool = False):
+        # Only the trial's own result ends the trial, not a late result of a call started before the circuit opened
+        if trial:
+            self.trial_running = False
+        if ok:
+            self.consecutive = 0
+            self.opened_at = None
+        else:
+            self.consecutive += 1
+            if self.consecutive >= self.failures:
+                self.opened_at = time.time()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        return 'half-open' if self.trial_running else 'open'
+
+# ---------------------------- ProjectMetrics Implementation ----------------------------
+class ProjectMetrics:
+    def __init__(self):
+        """Call counts and recent latencies of one Playlab project."""
+        self.calls = 0
+        self.errors = 0
+        self.rejected = 0
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def percentile(self, q: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    def snapshot(self) -> dict:
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'rejected': self.rejected,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95)
+        }
+
+# ---------------------------- CallGuard Implementation ----------------------------
+class CallGuard:
+    def __init__(self, call_timeout: float = CALL_TIMEOUT, connect_timeout: float = CONNECT_TIMEOUT,
+                 read_timeout: float = READ_TIMEOUT, breaker_failures: int = BREAKER_FAILURES,
+                 breaker_reset: float = BREAKER_RESET):
+        """Process-wide circuit breakers, deadlines and metrics for Playlab calls, per project."""
+        self.call_timeout = call_timeout
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.breaker_failures = breaker_failures
+        self.breaker_reset = breaker_reset
+        self.lock = threading.Lock()
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.metrics: Dict[str, ProjectMetrics] = {}
+        self.executor = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix='playlab-call')
+
+    def _project(self, project_id: str):
+        if project_id not in self.breakers:
+            self.breakers[project_id] = CircuitBreaker(self.breaker_failures, self.breaker_reset)
+            self.metrics[project_id] = ProjectMetrics()
+        return self.breakers[project_id], self.metrics[project_id]
+
+    def before_call(self, project_id: str) -> bool:
+        """
+        Raise CircuitOpenError if the project's circuit is open.
+
+        Returns:
+            bool: True if the call is the half-open trial, to be passed back to record()
+        """
+        with self.lock:
+            breaker, metrics = self._project(project_id)
+            allowed, trial = breaker.allow()
+            if not allowed:
+                metrics.rejected += 1
+                raise CircuitOpenError(f"Playlab project {project_id} is unavailable")
+            return trial
+
+    def healthy(self, project_id: str) -> bool:
+        """False while the project's circuit is open."""
+        with self.lock:
+            breaker, _ = self._project(project_id)
+            return breaker.state == 'closed'
+
+    def record(self, project_id: str, latency: float, ok: bool, trial: bool = False):
+        """Record a finished call. `trial` is the value before_call() returned for it."""
+        with self.lock:
+            breaker, metrics = self._project(project_id)
+            previous_state = breaker.state
+            breaker.record(ok, trial)
+            metrics.calls += 1
+            metrics.latencies.append(latency)
+            if not ok:
+                metrics.errors += 1
+            state = breaker.state
+            snapshot = metrics.snapshot() if metrics.calls % METRICS_LOG_EVERY == 0 else None
+        if state != previous_state:
+            logger.warning(f"Playlab circuit for {project_id} is now {state}")
+        if snapshot:
+            logger.info(f"Playlab metrics for {project_id}: {snapshot['calls']} calls, {snapshot['errors']} errors, "
+                        f"{snapshot['rejected']} rejected, p50 {snapshot['p50']:.2f}s, p95 {snapshot['p95']:.2f}s")
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Current metrics and circuit state of every project."""
+        with self.lock:
+            return {project_id: {**metrics.snapshot(), 'circuit': self.breakers[project_id].state}
+                    for project_id, metrics in self.metrics.items()}
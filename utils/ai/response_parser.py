@@ -0,0 +1,154 @@
+import threading
+from typing import Dict, Iterator, Optional
+
+# Characters allowed between fields of the response object
+STRUCTURAL_CHARS = set(',: \t\r\n')
+MAX_PREAMBLE = 200  # Characters of free text tolerated before the opening brace (e.g. a code fence)
+
+class ResponseParser:
+    """
+    Single-pass streaming parser for the triple-quoted response protocol:
+
+        {
+            "message": \"\"\"...\"\"\",
+            "content": \"\"\"...\"\"\"
+        }
+
+    Fields are available in `fields` as soon as their closing quotes arrive, the
+    value of `stream_key` is returned incrementally by `feed`, and `malformed` is
+    set as soon as the response can no longer match the protocol. Text before the
+    opening brace and after the object is ignored, and fields completed before the
+    response went wrong stay in `fields`.
+    """
+
+    def __init__(self, stream_key: Optional[str] = 'message'):
+        self.stream_key = stream_key
+        self.buffer = ''
+        self.pos = 0
+        self.state = 'seek_object'
+        self.key_start = None
+        self.key = None
+        self.value_start = None
+        self.emitted = 0
+        self.fields: Dict[str, str] = {}
+        self.malformed: Optional[str] = None
+
+    def _fail(self, reason: str):
+        self.malformed = reason
+        self.state = 'failed'
+
+    def feed(self, chunk: str) -> str:
+        """
+        Add a chunk of the response.
+
+        Returns:
+            str: Newly available text of the `stream_key` field
+        """
+        self.buffer += chunk
+        streamed = ''
+        buffer = self.buffer
+
+        while self.pos < len(buffer) and self.state not in ('done', 'failed'):
+            if self.state == 'in_value':
+                end_idx = buffer.find('"""', self.pos)
+                if end_idx == -1:
+                    # Hold back trailing quotes that may start the closing delimiter
+                    safe_end = len(buffer)
+                    while safe_end > self.pos and buffer[safe_end - 1] == '"':
+                        safe_end -= 1
+                    self.pos = safe_end
+                    if self.key == self.stream_key:
+                        streamed += buffer[self.emitted:safe_end]
+                        self.emitted = safe_end
+                    break
+                if self.key == self.stream_key:
+                    streamed += buffer[self.emitted:end_idx]
+                    self.emitted = end_idx
+                self.fields.setdefault(self.key, buffer[self.value_start:end_idx])
+                self.pos = end_idx + 3
+                self.state = 'seek_key'
+                continue
+
+            char = buffer[self.pos]
+            if self.state == 'seek_object':
+                # Keys are only matched inside the object, so quotes in a preamble are not mistaken for one
+                if char == '{':
+                    self.state = 'seek_key'
+                elif self.pos >= MAX_PREAMBLE:
+                    self._fail(f"No opening brace in the first {MAX_PREAMBLE} characters")
+                self.pos += 1
+            elif self.state == 'seek_key':
+                if char == '"':
+                    self.state = 'in_key'
+                    self.key_start = self.pos + 1
+                elif char in STRUCTURAL_CHARS:
+                    pass
+                elif self.fields:
+                    # The closing brace, or text where it should be (e.g. a code fence): the rest is ignored
+                    self.state = 'done'
+                else:
+                    self._fail(f"Unexpected text outside of a field at position {self.pos}")
+                self.pos += 1
+            elif self.state == 'in_key':
+                if char == '"':
+                    self.key = buffer[self.key_start:self.pos]
+                    self.state = 'after_key'
+                elif char == '\n':
+                    self._fail(f"Unterminated key at position {self.key_start}")
+                self.pos += 1
+            elif self.state == 'after_key':
+                if char == ':':
+                    self.state = 'after_colon'
+                elif not char.isspace():
+                    self._fail(f"Expected ':' after key {self.key!r}")
+                self.pos += 1
+            elif self.state == 'after_colon':
+                if char.isspace():
+                    self.pos += 1
+                elif len(buffer) - self.pos < 3:
+                    break  # Wait for the full opening delimiter
+                elif buffer.startswith('"""', self.pos):
+                    self.pos += 3
+                    self.value_start = self.emitted = self.pos
+                    self.state = 'in_value'
+                else:
+                    self._fail(f"Value of {self.key!r} is not triple-quoted")
+
+        return streamed
+
+    def close(self) -> Dict[str, str]:
+        """Mark the end of the response and return the completed fields."""
+        if self.state == 'in_value':
+            self._fail(f"Value of {self.key!r} was never closed")
+        return self.fields
+
+    @property
+    def text(self) -> str:
+        """The full response received so far."""
+        return self.buffer
+
+def stream_field(deltas: Iterator[str], parser: ResponseParser, cancel: Optional[threading.Event] = None) -> Iterator[str]:
+    """
+    Feed response deltas to a parser, yielding the streamed field's text.
+    Stops reading, and closes the underlying response, as soon as the output is malformed
+    or `cancel` is set. Cancellation is checked on every delta, also when nothing is streamed.
+    """
+    try:
+        for delta in deltas:
+            text = parser.feed(delta)
+            if text:
+                yield text
+            if parser.malformed or (cancel is not None and cancel.is_set()):
+                break
+    finally:
+        close = getattr(deltas, 'close', None)
+        if close:
+            close()
+    parser.close()
+
+def parse_response(text: str, keys=('message', 'content')) -> dict:
+    """Parse a complete response, returning the requested keys that were found."""
+    parser = ResponseParser(stream_key=None)
+    parser.feed(text)
+    fields = parser.close()
+    return {key: fields[key] for key in keys if key in fields}
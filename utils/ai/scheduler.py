@@ -0,0 +1,156 @@
+import time
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterator, List, Optional
+
+import streamlit as st
+
+from utils.core.config import open_config
+from utils.core.logger import logger
+from utils.ai.resilience import guarded_stream
+
+# Defaults (overridden by config/playlab.yaml)
+MAX_IN_FLIGHT = 8  # Concurrent requests per Playlab project in this process (not across processes)
+QUEUE_TIMEOUT = 120  # Seconds a request may wait for a slot
+POSITION_INTERVAL = 0.5  # Seconds between queue position updates
+
+# Request priorities, lower runs first
+PRIORITY_TEACHER = 0
+PRIORITY_MODERATOR = 0
+PRIORITY_STUDENT = 1
+
+class QueueTimeout(Exception):
+    """A request waited too long for a free slot."""
+
+@st.cache_resource(show_spinner=False)
+def get_scheduler():
+    """Singleton instance of LLMScheduler configured from config/playlab.yaml."""
+    config = open_config()['playlab']
+    return LLMScheduler(
+        max_in_flight=config.get('max_in_flight', MAX_IN_FLIGHT),
+        queue_timeout=config.get('queue_timeout', QUEUE_TIMEOUT)
+    )
+
+def scheduled_stream(app, message: str, file_path: Optional[str] = None, priority: int = PRIORITY_STUDENT,
+                     client_id: str = '', on_position: Optional[Callable[[int], None]] = None,
+                     stats: Optional[dict] = None) -> Iterator[str]:
+    """
+    guarded_stream that first waits for one of the project's request slots.
+    The slot is held until the response has been read or the stream is closed.
+
+    Args:
+        app (PlaylabApp): Client holding the conversation
+        message (str): Message to send
+        file_path (str, optional): File to attach to the message
+        priority (int): PRIORITY_TEACHER, PRIORITY_MODERATOR or PRIORITY_STUDENT
+        client_id (str): Requests are queued fairly across clients (e.g. session IDs)
+        on_position (callable, optional): Called with the number of requests ahead while waiting
+        stats (dict, optional): Filled with 'ttft' and 'total' as in stream_deltas
+    """
+    with get_scheduler().slot(app.project_id, client_id, priority, on_position):
+        yield from guarded_stream(app, message, file_path=file_path, stats=stats)
+
+class _Ticket:
+    def __init__(self, client_id: str, priority: int):
+        self.client_id = client_id
+        self.priority = priority
+        self.granted = threading.Event()
+
+# ---------------------------- LLMScheduler Implementation ----------------------------
+class LLMScheduler:
+    def __init__(self, max_in_flight: int = MAX_IN_FLIGHT, queue_timeout: float = QUEUE_TIMEOUT):
+        """
+        Process-wide admission control for Playlab requests.
+
+        Each project has at most `max_in_flight` requests running in this process. Slots
+        are not shared between processes: a host running several server processes sends up
+        to `max_in_flight` requests per project from each of them, so size it per process.
+        Waiting requests are served by priority, and round-robin across clients within a
+        priority, so one busy session cannot starve the others.
+        """
+        self.max_in_flight = max_in_flight
+        self.queue_timeout = queue_timeout
+        self.lock = threading.Lock()
+        self.in_flight: Dict[str, int] = {}
+        # project -> priority -> client -> waiting tickets; client order is the round-robin order
+        self.waiting: Dict[str, Dict[int, OrderedDict]] = {}
+
+    def _dispatch_order(self, project_id: str) -> List[_Ticket]:
+        """Waiting tickets in the order they will be granted."""
+        order = []
+        for priority in sorted(self.waiting.get(project_id, {})):
+            queues = [list(q) for q in self.waiting[project_id][priority].values()]
+            depth = 0
+            while any(depth < len(q) for q in queues):
+                order.extend(q[depth] for q in queues if depth < len(q))
+                depth += 1
+        return order
+
+    def _grant_next(self, project_id: str):
+        """Grant free slots to the next waiting tickets. Call with the lock held."""
+        priorities = self.waiting.get(project_id, {})
+        while self.in_flight.get(project_id, 0) < self.max_in_flight:
+            non_empty = [p for p in sorted(priorities) if priorities[p]]
+            if not non_empty:
+                return
+            clients: OrderedDict = priorities[non_empty[0]]
+            client_id, queue = next(iter(clients.items()))
+            ticket = queue.popleft()
+            # Move the client to the back of the rotation
+            del clients[client_id]
+            if queue:
+                clients[client_id] = queue
+            self.in_flight[project_id] = self.in_flight.get(project_id, 0) + 1
+            ticket.granted.set()
+
+    def _withdraw(self, project_id: str, ticket: _Ticket):
+        """Remove a ticket that gave up waiting. Call with the lock held."""
+        clients = self.waiting.get(project_id, {}).get(ticket.priority, {})
+        queue: Deque[_Ticket] = clients.get(ticket.client_id)
+        if queue and ticket in queue:
+            queue.remove(ticket)
+            if not queue:
+                del clients[ticket.client_id]
+
+    def position(self, project_id: str, ticket: _Ticket) -> int:
+        """Number of requests that will be granted before this ticket."""
+        with self.lock:
+            order = self._dispatch_order(project_id)
+        return order.index(ticket) if ticket in order else 0
+
+    @contextmanager
+    def slot(self, project_id: str, client_id: str = '', priority: int = PRIORITY_STUDENT,
+             on_position: Optional[Callable[[int], None]] = None):
+        """Hold one of the project's request slots, waiting for it if all are in use."""
+        ticket = _Ticket(client_id, priority)
+        with self.lock:
+            clients = self.waiting.setdefault(project_id, {}).setdefault(priority, OrderedDict())
+            clients.setdefault(client_id, deque()).append(ticket)
+            self._grant_next(project_id)
+
+        start = time.monotonic()
+        try:
+            while not ticket.granted.wait(POSITION_INTERVAL):
+                if time.monotonic() - start > self.queue_timeout:
+                    raise QueueTimeout(f"No free slot for {project_id} after {self.queue_timeout}s")
+                if on_position is not None:
+                    on_position(self.position(project_id, ticket))
+        except BaseException:
+            # Timed out or interrupted (e.g. a rerun): leave the queue, releasing the slot if it was just granted
+            with self.lock:
+                self._withdraw(project_id, ticket)
+                if ticket.granted.is_set():
+                    self.in_flight[project_id] -= 1
+                    self._grant_next(project_id)
+            raise
+
+        waited = time.monotonic() - start
+        if waited > 1:
+            logger.info(f"Request to {project_id} waited {waited:.1f}s for a slot")
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.in_flight[project_id] -= 1
+                self._grant_next(project_id)
@@ -0,0 +1,181 @@
+import re
+import json
+import time
+import uuid
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+import streamlit as st
+from playlab_api import PlaylabApp
+
+from utils.core.config import open_config
+from utils.core.logger import logger
+
+# Defaults (overridden by config/standin.yaml)
+HOST = '127.0.0.1'
+PORT = 8765
+LATENCY = 0.8  # Seconds before the first token of a response
+TOKEN_RATE = 40  # Tokens streamed per second
+FAILURE_RATE = 0.0  # Fraction of requests answered with an HTTP 500
+INITIAL_MESSAGE = "Hi! I am a local stand-in for the Playlab assistant. How can I help?"
+DEFAULT_RESPONSE = '{\n    "message": """This is a response from the local Playlab stand-in."""\n}'
+
+def playlab_client():
+    """The client class to create: StandinPlaylabApp if config/standin.yaml enables the stand-in, else PlaylabApp."""
+    if open_config().get('standin', {}).get('enabled'):
+        return StandinPlaylabApp
+    return PlaylabApp
+
+def standin_settings() -> dict:
+    """StandinServer arguments from config/standin.yaml."""
+    config = open_config()
+    standin = config.get('standin', {})
+    responses = dict(standin.get('responses') or {})
+    # Canned responses are configured per project key, requests arrive per project ID
+    responses.update({project_id: responses[key] for key, project_id in config.get('playlab', {}).items()
+                      if key in responses})
+    return {
+        'host': standin.get('host', HOST),
+        'port': standin.get('port', PORT),
+        'latency': standin.get('latency', LATENCY),
+        'token_rate': standin.get('token_rate', TOKEN_RATE),
+        'failure_rate': standin.get('failure_rate', FAILURE_RATE),
+        'initial_message': standin.get('initial_message', INITIAL_MESSAGE),
+        'responses': responses
+    }
+
+@st.cache_resource(show_spinner=False)
+def get_standin_server():
+    """Singleton instance of StandinServer configured from config/standin.yaml, started in this process."""
+    server = StandinServer(**standin_settings())
+    server.start()
+    return server
+
+def tokenize(text: str):
+    """Split a response into word-sized deltas, keeping the whitespace."""
+    return re.findall(r'\s*\S+|\s+', text)
+
+# ---------------------------- StandinPlaylabApp Implementation ----------------------------
+class StandinPlaylabApp(PlaylabApp):
+    def __init__(self, project_id: Optional[str] = None, verbose: bool = False, base_url: Optional[str] = None):
+        """
+        PlaylabApp talking to the local stand-in server instead of Playlab.
+
+        Args:
+            project_id (str): Project ID, selecting the canned response
+            verbose (bool): Print messages to the console
+            base_url (str, optional): API URL of a stand-in server; defaults to the in-process server
+        """
+        # The client builds every URL from BASE_URL, so overriding it on the instance is enough
+        self.BASE_URL = base_url or get_standin_server().url
+        super().__init__(api_key='standin', project_id=project_id, verbose=verbose)
+
+# ---------------------------- StandinServer Implementation ----------------------------
+class StandinServer:
+    def __init__(self, host: str = HOST, port: int = PORT, latency: float = LATENCY, token_rate: float = TOKEN_RATE,
+                 failure_rate: float = FAILURE_RATE, initial_message: str = INITIAL_MESSAGE,
+                 responses: Optional[Dict[str, str]] = None):
+        """
+        Local HTTP server implementing the parts of the Playlab API the app uses: creating a
+        conversation, listing its messages and streaming a response as server-sent events.
+
+        Each response is a canned reply for the project, streamed after `latency` seconds at
+        `token_rate` tokens per second. A `failure_rate` fraction of requests fail with HTTP 500.
+        Use port 0 to pick a free port.
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.token_rate = token_rate
+        self.failure_rate = failure_rate
+        self.initial_message = initial_message
+        self.responses = responses or {}
+        self.httpd: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        """Base API URL, as PlaylabApp.BASE_URL."""
+        return f"http://{self.host}:{self.port}/api/v1"
+
+    def response_for(self, project_id: str) -> str:
+        return self.responses.get(project_id) or DEFAULT_RESPONSE
+
+    def start(self):
+        """Serve requests on a daemon thread."""
+        handler = type('StandinHandler', (_StandinHandler,), {'standin': self})
+        self.httpd = ThreadingHTTPServer((self.host, self.port), handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        threading.Thread(target=self.httpd.serve_forever, name='playlab-standin', daemon=True).start()
+        logger.info(f"Playlab stand-in listening on {self.url}")
+
+    def stop(self):
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+class _StandinHandler(BaseHTTPRequestHandler):
+    standin: StandinServer
+    conversations = re.compile(r'^/api/v1/projects/([^/]+)/conversations/?$')
+    messages = re.compile(r'^/api/v1/projects/([^/]+)/conversations/([^/]+)/messages/?$')
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, data: dict):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _fail(self) -> bool:
+        """Answer with an injected failure, if this request draws one."""
+        if random.random() < self.standin.failure_rate:
+            self._send_json(500, {'error': 'Injected stand-in failure'})
+            return True
+        return False
+
+    def do_GET(self):
+        if not self.messages.match(self.path):
+            return self._send_json(404, {'error': 'Not found'})
+        if self._fail():
+            return
+        # The client reads the assistant's introduction from the second message
+        self._send_json(200, {'messages': [
+            {'source': 'user', 'content': ''},
+            {'source': 'provider', 'content': self.standin.initial_message}
+        ]})
+
+    def do_POST(self):
+        # The message (JSON or a multipart file upload) is read and discarded
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if self.conversations.match(self.path):
+            if self._fail():
+                return
+            return self._send_json(200, {'conversation': {'id': uuid.uuid4().hex}})
+
+        match = self.messages.match(self.path)
+        if not match:
+            return self._send_json(404, {'error': 'Not found'})
+        if self._fail():
+            return
+        time.sleep(self.standin.latency)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        delay = 1 / self.standin.token_rate if self.standin.token_rate else 0
+        try:
+            for delta in tokenize(self.standin.response_for(match.group(1))):
+                self.wfile.write(f"data: {json.dumps({'delta': delta})}\n\n".encode())
+                self.wfile.flush()
+                time.sleep(delay)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading
+            pass
+        self.close_connection = True
@@ -0,0 +1,69 @@
+import os
+import json
+import time
+import mimetypes
+from typing import Iterator, Optional, Tuple
+
+import requests
+
+from utils.core.logger import logger
+
+class DeadlineExceeded(Exception):
+    """A Playlab call ran past its deadline."""
+
+def stream_deltas(app, message: str, file_path: Optional[str] = None, stats: Optional[dict] = None,
+                  timeout: Optional[Tuple[float, float]] = None, deadline: Optional[float] = None) -> Iterator[str]:
+    """
+    Send a message in a Playlab conversation and yield the response text as it arrives.
+
+    PlaylabApp.send_message reads the server-sent event stream to the end before
+    returning, so this reads the same stream directly from the messages endpoint.
+
+    Args:
+        app (PlaylabApp): Client holding the conversation
+        message (str): Message to send
+        file_path (str, optional): File to attach to the message
+        stats (dict, optional): Filled with 'ttft' (seconds to first token) and 'total' (seconds)
+        timeout (tuple, optional): (connect, read) timeouts in seconds for the HTTP request
+        deadline (float, optional): time.monotonic() value after which the response is abandoned
+
+    Yields:
+        str: Response text deltas
+    """
+    url = f"{app.BASE_URL}/projects/{app.project_id}/conversations/{app.conversation_id}/messages"
+    start = time.perf_counter()
+    if file_path:
+        # Multipart upload, without the JSON content type
+        headers = {k: v for k, v in app.headers.items() if k.lower() != 'content-type'}
+        mime_type = mimetypes.guess_type(file_path)[0] or 'application/octet-stream'
+        file_name = os.path.basename(file_path)
+        with open(file_path, 'rb') as f:
+            response = requests.post(url, headers=headers, stream=True, timeout=timeout,
+                                     files={'file': (file_name, f, mime_type)},
+                                     data={'input.message': message, 'originalFileName': file_name})
+    else:
+        response = requests.post(url, headers=app.headers, json={"input": {"message": message}}, stream=True, timeout=timeout)
+
+    with response:
+        response.raise_for_status()
+        first = True
+        for line in response.iter_lines():
+            if deadline is not None and time.monotonic() > deadline:
+                raise DeadlineExceeded(f"Response not finished after {time.perf_counter() - start:.0f}s")
+            if not line or not line.startswith(b"data:"):
+                continue
+            try:
+                delta = json.loads(line[5:]).get("delta")
+            except json.JSONDecodeError:
+                continue
+            if not delta:
+                continue
+            if first:
+                first = False
+                ttft = time.perf_counter() - start
+                if stats is not None:
+                    stats['ttft'] = ttft
+                logger.info(f"Time to first token: {ttft:.2f}s")
+            yield delta
+    if stats is not None:
+        stats['total'] = time.perf_counter() - start
@@ -0,0 +1,185 @@
+import os
+import json
+import time
+import bisect
+import logging
+import threading
+from dataclasses import dataclass, asdict, field
+from logging.handlers import RotatingFileHandler
+from typing import Dict, Optional, Tuple
+
+import streamlit as st
+
+from utils.core.config import open_config
+from utils.core.logger import logger
+
+# Defaults (overridden by config/playlab.yaml)
+TELEMETRY_FILE = 'logs/ai_calls.jsonl'  # Relative to the app directory, suffixed with the process ID
+TELEMETRY_MAX_BYTES = 5000000  # Size at which the file is rolled over
+TELEMETRY_BACKUPS = 3  # Rolled over files kept
+SUMMARY_LOG_EVERY = 100  # Log the aggregates once every this many calls
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS = (0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120)  # Seconds
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+APP_DIR = os.path.join(os.path.dirname(__file__), '../..')
+
+@st.cache_resource(show_spinner=False)
+def get_telemetry():
+    """
+    Singleton instance of Telemetry configured from config/playlab.yaml.
+    Each process writes its own file (e.g. logs/ai_calls.1234.jsonl): processes sharing
+    one rotating file would rename it from under each other.
+    """
+    config = open_config()['playlab']
+    root, ext = os.path.splitext(config.get('telemetry_file', TELEMETRY_FILE))
+    path = f"{root}.{os.getpid()}{ext}"
+    return Telemetry(
+        path=path if os.path.isabs(path) else os.path.join(APP_DIR, path),
+        max_bytes=config.get('telemetry_max_bytes', TELEMETRY_MAX_BYTES),
+        backups=config.get('telemetry_backups', TELEMETRY_BACKUPS)
+    )
+
+@dataclass
+class CallRecord:
+    """One logical AI call: a message and its response, including any retries."""
+    project_id: str
+    role: str  # 'student', 'teacher' or 'moderator'
+    request_bytes: int = 0
+    response_bytes: int = 0
+    latency: float = 0.0  # Seconds from the first attempt to the final response
+    ttft: Optional[float] = None  # Seconds to the first token of the final attempt
+    retries: int = 0
+    parsed: bool = False
+    error: str = ''
+    timestamp: float = field(default_factory=time.time)
+
+    def attempt(self, request: str, response: str, stats: Optional[dict] = None):
+        """Record the sizes and timings of the latest attempt."""
+        self.request_bytes = len(request.encode('utf-8'))
+        self.response_bytes = len(response.encode('utf-8'))
+        if stats:
+            self.ttft = stats.get('ttft', self.ttft)
+
+# ---------------------------- Histogram Implementation ----------------------------
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        """Counts of observations per bucket; the last bucket holds everything above the largest bound."""
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += 1
+        self.sum += value
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th quantile."""
+        if not self.total:
+            return 0.0
+        rank = q * self.total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.buckets[i] if i < len(self.buckets) else float('inf')
+        return float('inf')
+
+    def snapshot(self) -> dict:
+        labels = [f"<={bound}" for bound in self.buckets] + [f">{self.buckets[-1]}"]
+        return {
+            'count': self.total,
+            'mean': self.sum / self.total if self.total else 0.0,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'buckets': dict(zip(labels, self.counts))
+        }
+
+class _CallStats:
+    def __init__(self):
+        """Aggregates of the calls of one project and role."""
+        self.calls = 0
+        self.errors = 0
+        self.parse_failures = 0
+        self.retries = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.ttft = Histogram(LATENCY_BUCKETS)
+        self.request_bytes = Histogram(BYTES_BUCKETS)
+        self.response_bytes = Histogram(BYTES_BUCKETS)
+
+    def add(self, record: CallRecord):
+        self.calls += 1
+        self.retries += record.retries
+        if record.error:
+            self.errors += 1
+        elif not record.parsed:
+            self.parse_failures += 1
+        self.latency.observe(record.latency)
+        if record.ttft is not None:
+            self.ttft.observe(record.ttft)
+        self.request_bytes.observe(record.request_bytes)
+        self.response_bytes.observe(record.response_bytes)
+
+    def snapshot(self) -> dict:
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'parse_failures': self.parse_failures,
+            'retries': self.retries,
+            'latency': self.latency.snapshot(),
+            'ttft': self.ttft.snapshot(),
+            'request_bytes': self.request_bytes.snapshot(),
+            'response_bytes': self.response_bytes.snapshot()
+        }
+
+# ---------------------------- Telemetry Implementation ----------------------------
+class Telemetry:
+    def __init__(self, path: Optional[str] = None, max_bytes: int = TELEMETRY_MAX_BYTES, backups: int = TELEMETRY_BACKUPS):
+        """
+        Process-wide AI call metrics: aggregated in memory per project and role, and
+        appended as JSON lines to a rolling file. Writing to the file is skipped if it
+        cannot be opened.
+        """
+        self.lock = threading.Lock()
+        self.stats: Dict[Tuple[str, str], _CallStats] = {}
+        self.calls = 0
+        self.file_logger = None
+        if path:
+            try:
+                os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+                handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups)
+                handler.setFormatter(logging.Formatter('%(message)s'))
+                self.file_logger = logging.getLogger('ai_telemetry')
+                self.file_logger.setLevel(logging.INFO)
+                self.file_logger.propagate = False
+                for existing in self.file_logger.handlers[:]:
+                    self.file_logger.removeHandler(existing)
+                self.file_logger.addHandler(handler)
+            except OSError as e:
+                logger.warning(f"AI telemetry file unavailable: {e}")
+
+    def record(self, record: CallRecord):
+        """Add a finished call to the aggregates and the rolling file."""
+        with self.lock:
+            stats = self.stats.setdefault((record.project_id, record.role), _CallStats())
+            stats.add(record)
+            self.calls += 1
+            summary = self.calls % SUMMARY_LOG_EVERY == 0
+        if self.file_logger is not None:
+            self.file_logger.info(json.dumps(asdict(record)))
+        logger.info(f"AI call {record.role}@{record.project_id}: {record.latency:.2f}s, "
+                    f"{record.request_bytes}B -> {record.response_bytes}B, {record.retries} retries"
+                    + (f", error {record.error}" if record.error else '' if record.parsed else ", unparsed"))
+        if summary:
+            for (project_id, role), snapshot in self.snapshot().items():
+                logger.info(f"AI calls {role}@{project_id}: {snapshot['calls']} calls, {snapshot['errors']} errors, "
+                            f"{snapshot['parse_failures']} unparsed, latency p50 {snapshot['latency']['p50']}s "
+                            f"p95 {snapshot['latency']['p95']}s")
+
+    def snapshot(self) -> Dict[Tuple[str, str], dict]:
+        """Aggregates of every project and role."""
+        with self.lock:
+            return {key: stats.snapshot() for key, stats in self.stats.items()}
@@ -1,39 +1,49 @@
-import streamlit as st
 import yaml
 import os
+import time
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping
 
-@st.cache_data
-def open_config(config_dir="../../config"):
+from utils.core.logger import logger
+
+# Constants
+RELOAD_CHECK_INTERVAL = 2  # Seconds between checks of the config files' modification times
+CONFIG_EXTENSIONS = ('.yaml', '.txt')
+
+def _freeze(value):
+    """Read-only view of loaded config data, so the shared object cannot be modified by a caller."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+def _load_config(config_dir):
     """
     Loads all configuration files from the config directory into a nested dictionary.
-    
+
     Args:
         config_dir (str): Path to the configuration directory
-    
+
     Returns:
         dict: Nested dictionary containing all configuration data
-    
-    Raises:
-        FileNotFoundError: If the configuration directory is not found
     """
-    config_dir = os.path.join(os.path.dirname(__file__), config_dir)
-    if not os.path.exists(config_dir):
-        raise FileNotFoundError(f"Configuration directory not found: {config_dir}")
-    
     config = {}
-    
+
     # Process all files in the config directory
     for filename in os.listdir(config_dir):
         filepath = os.path.join(config_dir, filename)
         if not os.path.isfile(filepath):
             continue
-            
+
         # Get the base name without extension
         name, ext = os.path.splitext(filename)
-        
+
         # Split name into parts for nested dict (e.g., 'questions_examples' -> ['questions', 'examples'])
         dict_keys = name.split('_')
-        
+
         # Load the file based on its extension
         if ext.lower() == '.yaml':
             with open(filepath, 'r') as file:
@@ -43,7 +53,7 @@ def open_config(config_dir="../../config"):
                 data = file.read()
         else:
             continue
-            
+
         # Create nested dictionary structure
         current_level = config
         for key in dict_keys[:-1]:
@@ -51,9 +61,149 @@ def open_config(config_dir="../../config"):
                 current_level[key] = {}
             current_level = current_level[key]
         current_level[dict_keys[-1]] = data
-    
+
     return config
-    
+
+# ---------------------------- ConfigStore Implementation ----------------------------
+class ConfigStore:
+    def __init__(self, config_dir: str):
+        """
+        Process-wide copy of the configuration directory. The files are parsed once and
+        reloaded when their modification times change, checked at most every
+        RELOAD_CHECK_INTERVAL seconds. If a changed file cannot be parsed (e.g. it is
+        half-written), the last loaded config is kept until the files change again.
+        """
+        self.config_dir = config_dir
+        self.lock = threading.Lock()
+        self.config = None
+        self.mtimes = None
+        self.checked_at = 0.0
+        self.sections = {}
+
+    def _scan(self):
+        return {entry.name: entry.stat().st_mtime for entry in os.scandir(self.config_dir)
+                if entry.is_file() and os.path.splitext(entry.name)[1].lower() in CONFIG_EXTENSIONS}
+
+    def get(self) -> Mapping:
+        if self.config is not None and time.monotonic() - self.checked_at < RELOAD_CHECK_INTERVAL:
+            return self.config
+        with self.lock:
+            if self.config is None or time.monotonic() - self.checked_at >= RELOAD_CHECK_INTERVAL:
+                mtimes = self._scan()
+                if mtimes != self.mtimes:
+                    try:
+                        config = _freeze(_load_config(self.config_dir))
+                    except (yaml.YAMLError, OSError, UnicodeDecodeError) as e:
+                        if self.config is None:
+                            raise
+                        logger.error(f"Could not reload config, keeping the last loaded config: {e}")
+                    else:
+                        self.config = config
+                        self.sections = {}
+                    self.mtimes = mtimes
+                self.checked_at = time.monotonic()
+            return self.config
+
+    def section(self, name: str, build):
+        """Typed view of a config section, rebuilt only when the config is reloaded."""
+        config = self.get()
+        typed = self.sections.get(name)
+        if typed is None or typed[0] is not config:
+            typed = (config, build(config.get(name) or {}))
+            self.sections[name] = typed
+        return typed[1]
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def _store(config_dir="../../config") -> ConfigStore:
+    config_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), config_dir))
+    store = _stores.get(config_dir)
+    if store is None:
+        if not os.path.exists(config_dir):
+            raise FileNotFoundError(f"Configuration directory not found: {config_dir}")
+        with _stores_lock:
+            store = _stores.setdefault(config_dir, ConfigStore(config_dir))
+    return store
+
+def open_config(config_dir="../../config"):
+    """
+    Returns all configuration files from the config directory as a nested, read-only mapping.
+
+    The same object is shared by every caller in the process and replaced when a file changes,
+    so callers should read values from it rather than keep it.
+
+    Args:
+        config_dir (str): Path to the configuration directory
+
+    Returns:
+        Mapping: Nested mapping containing all configuration data
+
+    Raises:
+        FileNotFoundError: If the configuration directory is not found
+    """
+    return _store(config_dir).get()
+
+# ---------------------------- Typed Config Sections ----------------------------
+@dataclass(frozen=True)
+class PlaylabConfig:
+    """Required values are checked when read, so a missing key only breaks the feature using it."""
+    settings: Mapping  # The whole section, for tuning values read by the modules that use them
+
+    @property
+    def section_editor(self) -> str:
+        return _required(self.settings, 'playlab', 'section_editor')
+
+    @property
+    def student_assistant(self) -> str:
+        return _required(self.settings, 'playlab', 'student_assistant')
+
+    @property
+    def section_moderator(self) -> str:
+        return _required(self.settings, 'playlab', 'section_moderator')
+
+    @property
+    def default_system_prompt(self) -> str:
+        return _required(self.settings, 'playlab', 'student_assistant_default_system_prompt')
+
+    @property
+    def moderator_prompt_version(self) -> str:
+        return str(self.settings.get('section_moderator_prompt_version', 1))
+
+@dataclass(frozen=True)
+class EmailConfig:
+    email: str
+
+@dataclass(frozen=True)
+class ImagesConfig:
+    logo_full: str
+
+@dataclass(frozen=True)
+class DomainConfig:
+    url: str
+
+def _required(section: Mapping, name: str, key: str):
+    """A required config value, raising KeyError naming the file it is missing from."""
+    value = section.get(key)
+    if value is None or value == '':
+        raise KeyError(f"Missing '{key}' in config/{name}.yaml")
+    return value
+
+def playlab_config() -> PlaylabConfig:
+    """Playlab project IDs and assistant settings from config/playlab.yaml."""
+    return _store().section('playlab', lambda section: PlaylabConfig(settings=section))
+
+def email_config() -> EmailConfig:
+    """Sender and admin address from config/email.yaml."""
+    return _store().section('email', lambda section: EmailConfig(email=_required(section, 'email', 'email')))
+
+def images_config() -> ImagesConfig:
+    """Image URLs from config/images.yaml."""
+    return _store().section('images', lambda section: ImagesConfig(logo_full=_required(section, 'images', 'logo_full')))
+
+def domain_config() -> DomainConfig:
+    """Public URL of the app from config/domain.yaml."""
+    return _store().section('domain', lambda section: DomainConfig(url=_required(section, 'domain', 'url')))
+
 def domain_url():
-    config = open_config()
-    return config["domain"]["url"]
\ No newline at end of file
+    return domain_config().url
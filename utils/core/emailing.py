@@ -1,7 +1,7 @@
 import os
 import smtplib
 from email.mime.text import MIMEText
-from utils.core.config import open_config
+from utils.core.config import email_config
 
 def send_email(subject, body, sender, sender_password, recipient, sender_name=None, html=False, headers=None):
     if html:
@@ -28,8 +28,7 @@ def send_access_code(access_code, user_email):
     """
     Send an access code email to the user, with both plain-text and HTML formats.
     """
-    config = open_config()['email']
-    sender = config['email']
+    sender = email_config().email
     sender_password = os.environ['EMAIL_PASSWORD']
     subject = 'OpenCourse: Your Access Code'
 
@@ -48,8 +47,7 @@ def send_error_email(traceback, session_state):
         traceback (str): The error traceback information
         session_state (dict): The current session state information
     """
-    sender = open_config()['email']['email']
-    recipient = open_config()['email']['email']
+    sender = recipient = email_config().email
     sender_password = os.environ['EMAIL_PASSWORD']
     
     subject = 'OpenCourse: Error Notification 🚨'
@@ -85,8 +83,7 @@ def send_error_email(traceback, session_state):
     send_email(subject, body, sender, sender_password, recipient, sender_name='OpenCourse System', html=True)
 
 def send_email_support(user_email, message):
-    sender = open_config()['email']['email']
-    recipient = open_config()['email']['email']
+    sender = recipient = email_config().email
     sender_password = os.environ['EMAIL_PASSWORD']
 
     subject = 'OpenCourse: User Support'
@@ -67,6 +67,10 @@ class AppLogger:
         if self.should_log(message):
             self.logger.info(message)
     
+    def debug(self, message, *args):
+        # Pass values as %s arguments: they are only formatted when debug logging is enabled
+        self.logger.debug(message, *args)
+
     def error(self, message):
         self.logger.error(message)
     
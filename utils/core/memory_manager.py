@@ -2,21 +2,31 @@ import os
 import sys
 import gc
 import json
+import time
 import threading
 from pathlib import Path
-from typing import Dict
-from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+from datetime import datetime
 import psutil
 
 import streamlit as st
 from streamlit.runtime import get_instance
 from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
+from utils.core.config import open_config
 from utils.core.logger import logger
+from utils.core.session_budget import get_session_budget
 
 # Constants
 HEARTBEAT_TIMEOUT = 30  # 30 minutes (timeout for inactive sessions)
 CLEANUP_INTERVAL = 300  # 5 minutes (cleanup frequency)
+SNAPSHOT_INTERVAL = 60  # 1 minute (heartbeat snapshot frequency)
+SAMPLE_INTERVAL = 30  # 30 seconds (memory sampling frequency)
+MIN_SESSION_TIMEOUT = 5  # 5 minutes (timeout for inactive sessions under memory pressure)
+EMERGENCY_IDLE_MINUTES = 1  # 1 minute (shortest idle time of a session closed by an emergency cleanup)
+MEMORY_LOW_WATER = 0.6  # Fraction of the memory quota where the timeout starts to shrink
+MEMORY_HIGH_WATER = 0.85  # Fraction of the memory quota that triggers an emergency cleanup
+MIN_CLEANUP_INTERVAL = 60  # 1 minute (shortest gap between cleanups below the high-water mark)
 
 @st.cache_resource(show_spinner=False)
 def get_heartbeat_manager():
@@ -33,7 +43,9 @@ def initialize_memory_and_heartbeat():
     if "cleanup_initialized" not in st.session_state:
         memory_manager = get_memory_manager()
         memory_manager.start_periodic_cleanup()
-        st.session_state['heartbeat_manager'] = get_heartbeat_manager()
+        heartbeat_manager = get_heartbeat_manager()
+        heartbeat_manager.start_snapshots()
+        st.session_state['heartbeat_manager'] = heartbeat_manager
         st.session_state.cleanup_initialized = True
 
 def update_session_activity():
@@ -46,77 +58,204 @@ def update_session_activity():
 
 # ---------------------------- HeartbeatManager Implementation ----------------------------
 class HeartbeatManager:
-    def __init__(self, storage_file: str = "session_heartbeats.json"):
-        """Manages session activity and heartbeat tracking."""
-        self.storage_file = Path(storage_file)
+    def __init__(self, storage_file: Optional[str] = "session_heartbeats.json", snapshot_interval: int = SNAPSHOT_INTERVAL):
+        """Tracks session activity in memory, with an optional periodic snapshot to disk."""
+        self.storage_file = Path(storage_file) if storage_file else None
+        self.snapshot_interval = snapshot_interval
         self.lock = threading.Lock()
-        self._ensure_storage_file()
-
-    def _ensure_storage_file(self):
-        """Create storage file if it doesn't exist."""
-        if not self.storage_file.exists():
-            with open(self.storage_file, 'w') as f:
-                json.dump({}, f)
+        self.sessions: Dict[str, float] = {}  # session_id -> last activity (epoch seconds)
+        self._dirty = False
+        self._timer = None
+        self.snapshots_running = False
+        self._load_snapshot()
 
-    def _load_sessions(self) -> Dict:
-        """Load session data from file."""
+    def _load_snapshot(self):
+        """Restore activity times from the last snapshot, if there is one."""
+        if self.storage_file is None or not self.storage_file.exists():
+            return
         try:
             with open(self.storage_file, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            return {}
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return
+        for session_id, entry in data.items():
+            try:
+                self.sessions[session_id] = datetime.fromisoformat(entry['last_activity']).timestamp()
+            except (KeyError, TypeError, ValueError):
+                continue
+
+    def _format_sessions(self, sessions: Dict[str, float]) -> Dict:
+        """Convert activity times to the heartbeat/last_activity record format."""
+        formatted = {}
+        for session_id, last_activity in sessions.items():
+            timestamp = datetime.fromtimestamp(last_activity).isoformat()
+            formatted[session_id] = {
+                'heartbeat': timestamp,
+                'last_activity': timestamp
+            }
+        return formatted
+
+    def snapshot(self):
+        """Write a compact snapshot of the heartbeat table if it changed since the last one."""
+        if self.storage_file is None or not self._dirty:
+            return
+        with self.lock:
+            sessions = dict(self.sessions)
+            self._dirty = False
+        tmp_file = self.storage_file.with_suffix('.tmp')
+        try:
+            with open(tmp_file, 'w') as f:
+                json.dump(self._format_sessions(sessions), f, separators=(',', ':'))
+            os.replace(tmp_file, self.storage_file)
+        except OSError as e:
+            logger.error(f"Heartbeat snapshot failed: {e}")
+
+    def start_snapshots(self):
+        """Start periodic snapshots in a background thread."""
+        if self.storage_file is None or self.snapshot_interval <= 0 or self.snapshots_running:
+            return
 
-    def _save_sessions(self, sessions: Dict):
-        """Save session data to file."""
-        with open(self.storage_file, 'w') as f:
-            json.dump(sessions, f, indent=2)
+        def snapshot_loop():
+            try:
+                self.snapshot()
+            finally:
+                self._timer = threading.Timer(self.snapshot_interval, snapshot_loop)
+                self._timer.daemon = True
+                self._timer.start()
+
+        self.snapshots_running = True
+        self._timer = threading.Timer(self.snapshot_interval, snapshot_loop)
+        self._timer.daemon = True
+        self._timer.start()
 
     def update_activity(self, session_id: str):
         """Update session's last activity and heartbeat timestamp."""
-        current_time = datetime.now().isoformat()
         with self.lock:
-            sessions = self._load_sessions()
-            sessions[session_id] = {
-                'heartbeat': current_time, 
-                'last_activity': current_time
-            }
-            self._save_sessions(sessions)
+            self.sessions[session_id] = time.time()
+            self._dirty = True
+
+    def idle_sessions(self, min_idle_minutes: float) -> Dict[str, float]:
+        """Sessions idle for at least min_idle_minutes, mapped to their idle time in seconds."""
+        now = time.time()
+        with self.lock:
+            return {session_id: now - last_activity for session_id, last_activity in self.sessions.items()
+                    if now - last_activity >= min_idle_minutes * 60}
+
+    def remove(self, session_id: str):
+        """Stop tracking a closed session."""
+        with self.lock:
+            if self.sessions.pop(session_id, None) is not None:
+                self._dirty = True
 
     def cleanup_sessions(self, timeout_minutes: int = HEARTBEAT_TIMEOUT):
         """Remove inactive sessions based on last activity."""
+        cutoff = time.time() - timeout_minutes * 60
         with self.lock:
-            sessions = self._load_sessions()
-            current_time = datetime.now()
-            active_sessions = {}
-            timeout = timedelta(minutes=timeout_minutes)
-            
-            for session_id, data in sessions.items():
-                if not isinstance(data, dict) or 'last_activity' not in data:
-                    continue
-                try:
-                    last_activity = datetime.fromisoformat(data['last_activity'])
-                    if (current_time - last_activity) < timeout:
-                        active_sessions[session_id] = data
-                except (ValueError, TypeError):
-                    continue
-            self._save_sessions(active_sessions)
-            return active_sessions
+            active_sessions = {session_id: last_activity for session_id, last_activity in self.sessions.items()
+                               if last_activity > cutoff}
+            if len(active_sessions) != len(self.sessions):
+                self._dirty = True
+            self.sessions = active_sessions
+        return self._format_sessions(active_sessions)
 
 # ---------------------------- MemoryManager Implementation ----------------------------
 class MemoryManager:
-    def __init__(self, cleanup_interval: int = CLEANUP_INTERVAL):
-        """Manages periodic cleanup of inactive sessions and memory."""
+    def __init__(self, cleanup_interval: int = CLEANUP_INTERVAL, sample_interval: int = SAMPLE_INTERVAL):
+        """Manages periodic cleanup of inactive sessions and memory, adapting to memory pressure."""
+        config = open_config().get('memory', {})
         self.cleanup_interval = cleanup_interval
+        self.sample_interval = config.get('memory_sample_interval', sample_interval)
+        self.low_water = config.get('memory_low_water', MEMORY_LOW_WATER)
+        self.high_water = config.get('memory_high_water', MEMORY_HIGH_WATER)
+        self.min_timeout = config.get('session_min_timeout', MIN_SESSION_TIMEOUT)
+        # Below min_timeout, as sessions idle for longer are already closed by the timeout sweep
+        self.emergency_idle = min(config.get('session_emergency_idle', EMERGENCY_IDLE_MINUTES), self.min_timeout)
+        self.quota_bytes = self._memory_quota(config.get('memory_quota_mb'))
         self.lock = threading.Lock()
         self._timer = None
+        self._last_cleanup = time.time()
         self.cleanup_running = False
 
-    def cleanup_streamlit_resources(self):
+    @staticmethod
+    def _memory_quota(quota_mb: Optional[float] = None) -> int:
+        """Memory available to this process: configured quota, cgroup limit, or total RAM."""
+        if quota_mb:
+            return int(quota_mb * 1024 * 1024)
+        for limit_file in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+            try:
+                with open(limit_file, 'r') as f:
+                    limit = f.read().strip()
+                if limit.isdigit() and int(limit) < psutil.virtual_memory().total:
+                    return int(limit)
+            except OSError:
+                continue
+        return psutil.virtual_memory().total
+
+    def memory_pressure(self) -> float:
+        """Current RSS as a fraction of the memory quota."""
+        return psutil.Process(os.getpid()).memory_info().rss / self.quota_bytes
+
+    def idle_timeout(self, pressure: float) -> float:
+        """Inactivity timeout in minutes, shrinking linearly between the low and high water marks."""
+        if pressure <= self.low_water:
+            return HEARTBEAT_TIMEOUT
+        if pressure >= self.high_water:
+            return self.min_timeout
+        fraction = (pressure - self.low_water) / (self.high_water - self.low_water)
+        return HEARTBEAT_TIMEOUT - fraction * (HEARTBEAT_TIMEOUT - self.min_timeout)
+
+    def cleanup_due_interval(self, pressure: float) -> float:
+        """Seconds between cleanups, shrinking from cleanup_interval towards MIN_CLEANUP_INTERVAL as pressure rises."""
+        if pressure <= self.low_water:
+            return self.cleanup_interval
+        fraction = min((pressure - self.low_water) / (self.high_water - self.low_water), 1.0)
+        scaled = self.cleanup_interval - fraction * (self.cleanup_interval - MIN_CLEANUP_INTERVAL)
+        return min(self.cleanup_interval, scaled)
+
+    def _reap_largest_idle(self, runtime, session_ids, target_bytes: int) -> Tuple[int, int]:
+        """
+        Close sessions idle for at least emergency_idle minutes, largest first, until the
+        estimated RSS drops below target_bytes.
+
+        Returns:
+            tuple: (sessions closed, estimated bytes freed)
+        """
+        session_sizes = get_session_budget().session_bytes()
+        idle_sessions = get_heartbeat_manager().idle_sessions(self.emergency_idle)
+        candidates = sorted(
+            (session_id for session_id in session_ids if session_id in idle_sessions),
+            key=lambda session_id: session_sizes.get(session_id, 0),
+            reverse=True
+        )
+
+        estimated_rss = psutil.Process(os.getpid()).memory_info().rss
+        closed = 0
+        freed = 0
+        for session_id in candidates:
+            if estimated_rss - freed <= target_bytes:
+                break
+            self._close_session(runtime, session_id)
+            freed += session_sizes.get(session_id, 0)
+            closed += 1
+            logger.info(f"Emergency closed session {session_id} "
+                        f"({session_sizes.get(session_id, 0) / 1e6:.1f}MB, idle {idle_sessions[session_id] / 60:.1f}min)")
+        return closed, freed
+
+    def _close_session(self, runtime, session_id: str):
+        """Close a Streamlit session and drop its bookkeeping."""
+        runtime.close_session(session_id)
+        get_session_budget().forget(session_id)
+        get_heartbeat_manager().remove(session_id)
+
+    def cleanup_streamlit_resources(self, emergency: bool = False):
         """Clean up Streamlit sessions and free memory."""
         
         with self.lock:
             process = psutil.Process(os.getpid())
             mem_before = process.memory_info().rss
+            pressure = mem_before / self.quota_bytes
+            timeout_minutes = self.idle_timeout(pressure)
+            self._last_cleanup = time.time()
             
             try:
                 # Get Streamlit runtime instance
@@ -127,34 +266,47 @@ class MemoryManager:
 
             # Cleanup inactive sessions using heartbeats
             closed = 0
+            reaped = 0
+            reaped_bytes = 0
             if runtime is not None:
                 try:
                     session_mgr = runtime._session_mgr
                     sessions = session_mgr.list_sessions()
-                    logger.info(f"Found {len(sessions)} sessions")
+                    logger.info(f"Found {len(sessions)} sessions "
+                                f"(memory at {pressure:.0%} of quota, idle timeout {timeout_minutes:.0f}min)")
                     
                     # Get active sessions from HeartbeatManager
                     heartbeat_manager = get_heartbeat_manager()
-                    active_sessions = heartbeat_manager.cleanup_sessions()
+                    active_sessions = heartbeat_manager.cleanup_sessions(timeout_minutes)
                     active_session_ids = active_sessions.keys()
 
                     # Get Streamlit's active sessions
                     streamlit_sessions = [s.session.id for s in sessions]
 
                     # Close sessions in Streamlit that are not in the HeartbeatManager's active list
+                    session_budget = get_session_budget()
                     for session_id in streamlit_sessions:
                         if session_id not in active_session_ids:
                             runtime.close_session(session_id)
+                            session_budget.forget(session_id)
                             closed += 1
                     logger.info(f"Closed {closed} inactive sessions")
+
+                    # Over the high-water mark, also close the largest idle sessions
+                    if emergency or pressure >= self.high_water:
+                        remaining = [session_id for session_id in streamlit_sessions if session_id in active_session_ids]
+                        reaped, reaped_bytes = self._reap_largest_idle(runtime, remaining,
+                                                                       int(self.low_water * self.quota_bytes))
+                        closed += reaped
+
+                    # Report per-session byte counts of large session_state entries
+                    for session_id, session_bytes in session_budget.session_bytes().items():
+                        logger.info(f"Session {session_id}: {session_bytes / 1e6:.1f}MB in session state")
                 except Exception as e:
                     logger.error(f"Session cleanup error: {str(e)}")
 
             # General memory cleanup
             gc.collect()
-            mem_after = process.memory_info().rss
-            if closed > 0:
-                logger.info(f"Cleared up { (mem_before - mem_after) / 1e6:.1f}MB")
 
             # Linux memory trimming
             if os.name == 'posix' and sys.platform != 'darwin':
@@ -166,13 +318,30 @@ class MemoryManager:
                 except Exception as e:
                     logger.info(f"malloc_trim failed: {e}")
 
+            mem_after = process.memory_info().rss
+            if closed > 0 or emergency:
+                logger.info(f"Cleared up {(mem_before - mem_after) / 1e6:.1f}MB from {closed} sessions "
+                            f"(memory now at {mem_after / self.quota_bytes:.0%} of quota)")
+            if reaped:
+                logger.info(f"Emergency closed {reaped} idle sessions holding an estimated "
+                            f"{reaped_bytes / 1e6:.1f}MB of session state")
+
+    def check_memory(self):
+        """Sample RSS and run a cleanup when it is due or memory pressure calls for one."""
+        pressure = self.memory_pressure()
+        if pressure >= self.high_water:
+            logger.warning(f"Memory at {pressure:.0%} of quota, running emergency cleanup")
+            self.cleanup_streamlit_resources(emergency=True)
+        elif time.time() - self._last_cleanup >= self.cleanup_due_interval(pressure):
+            self.cleanup_streamlit_resources()
+
     def start_periodic_cleanup(self):
-        """Start periodic cleanup in a background thread."""
+        """Start periodic memory sampling and cleanup in a background thread."""
         def cleanup_loop():
             try:
-                self.cleanup_streamlit_resources()
+                self.check_memory()
             finally:
-                self._timer = threading.Timer(self.cleanup_interval, cleanup_loop)
+                self._timer = threading.Timer(self.sample_interval, cleanup_loop)
                 self._timer.daemon = True
                 add_script_run_ctx(self._timer)
                 self._timer.start()
@@ -180,8 +349,7 @@ class MemoryManager:
         # Start the first cleanup
         if not self.cleanup_running:
             self.cleanup_running = True
-            self._timer = threading.Timer(self.cleanup_interval, cleanup_loop)
+            self._timer = threading.Timer(self.sample_interval, cleanup_loop)
             self._timer.daemon = True
             add_script_run_ctx(self._timer)
             self._timer.start()
-            self.cleanup_running = True
\ No newline at end of file
@@ -0,0 +1,114 @@
+import sys
+import threading
+from dataclasses import is_dataclass
+from typing import Dict, List
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from utils.core.config import open_config
+from utils.core.logger import logger
+from utils.ai.history import fold_history
+
+# Defaults (overridden by config/memory.yaml)
+SESSION_BUDGET_MB = 25
+SESSION_MIN_MESSAGES = 10
+
+# Large session_state entries, in eviction order.
+# Spillable entries are dropped from the session and re-read from the
+# process-wide data cache on access (see SessionManager.get_pdf_content).
+TRACKED_KEYS = ['pdf_content', 'user_courses', 'messages', 'template_content', 'editor_content']
+SPILLABLE_KEYS = ['pdf_content', 'user_courses']
+
+@st.cache_resource(show_spinner=False)
+def get_session_budget():
+    """Singleton instance of SessionBudget."""
+    config = open_config().get('memory', {})
+    return SessionBudget(
+        budget_mb=config.get('session_budget_mb', SESSION_BUDGET_MB),
+        min_messages=config.get('session_min_messages', SESSION_MIN_MESSAGES)
+    )
+
+def enforce_session_budget():
+    """Measure the current session and evict large entries if over budget. Call on every rerun."""
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return
+    get_session_budget().enforce(ctx.session_id, st.session_state)
+
+def deep_sizeof(obj, seen=None) -> int:
+    """Approximate the memory footprint of an object and everything it references."""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool)) or obj is None:
+        return size
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif is_dataclass(obj) or hasattr(obj, '__dict__'):
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+# ---------------------------- SessionBudget Implementation ----------------------------
+class SessionBudget:
+    def __init__(self, budget_mb: float = SESSION_BUDGET_MB, min_messages: int = SESSION_MIN_MESSAGES):
+        """Tracks the size of large session_state entries and enforces a per-session byte budget."""
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self.min_messages = min_messages
+        self.lock = threading.Lock()
+        self.sessions: Dict[str, Dict[str, int]] = {}
+
+    def measure(self, session_state) -> Dict[str, int]:
+        """Return the byte size of each tracked entry present in session_state."""
+        sizes = {}
+        for key in TRACKED_KEYS:
+            value = session_state.get(key)
+            if value:
+                sizes[key] = deep_sizeof(value)
+        return sizes
+
+    def _evict(self, key: str, session_state) -> bool:
+        """Evict a single entry. Returns True if anything was freed."""
+        if key in SPILLABLE_KEYS:
+            session_state[key] = None
+            return True
+        if key == 'messages':
+            # Older messages are folded into the chat summary rather than dropped
+            return fold_history(session_state, keep=self.min_messages)
+        return False
+
+    def enforce(self, session_id: str, session_state) -> List[str]:
+        """Record the session's entry sizes and evict entries until it is back under budget."""
+        sizes = self.measure(session_state)
+        evicted = []
+        if sum(sizes.values()) > self.budget_bytes:
+            # Spillable blobs go first, then chat history is trimmed
+            for key in TRACKED_KEYS:
+                if key not in sizes or not self._evict(key, session_state):
+                    continue
+                evicted.append(key)
+                sizes = self.measure(session_state)
+                if sum(sizes.values()) <= self.budget_bytes:
+                    break
+            logger.info(f"Session {session_id} over budget, evicted {evicted} "
+                        f"({sum(sizes.values()) / 1e6:.1f}MB remaining)")
+
+        with self.lock:
+            self.sessions[session_id] = sizes
+        return evicted
+
+    def session_bytes(self) -> Dict[str, int]:
+        """Total tracked bytes per session."""
+        with self.lock:
+            return {session_id: sum(sizes.values()) for session_id, sizes in self.sessions.items()}
+
+    def forget(self, session_id: str):
+        """Drop accounting for a closed session."""
+        with self.lock:
+            self.sessions.pop(session_id, None)
@@ -0,0 +1,59 @@
+import atexit
+import threading
+from collections import Counter
+
+import streamlit as st
+
+from utils.data.aws import increment_course_access
+
+# Constants
+FLUSH_INTERVAL = 300  # 5 minutes (access counts are written in batches this often)
+
+@st.cache_resource(show_spinner=False)
+def get_access_stats():
+    """Singleton instance of AccessStats."""
+    return AccessStats()
+
+def record_course_access(course_code: str):
+    """Count a session opening a course, once per session and course."""
+    if st.session_state.get('counted_course') == course_code:
+        return
+    st.session_state['counted_course'] = course_code
+    get_access_stats().record(course_code)
+
+# ---------------------------- AccessStats Implementation ----------------------------
+class AccessStats:
+    def __init__(self, flush_interval: float = FLUSH_INTERVAL):
+        """
+        Course access counts, buffered in memory and added to the stored counts by a
+        background timer, so recording an access never waits on DynamoDB. The last
+        batch is written when the process exits.
+        """
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.counts: Counter = Counter()
+        self._timer = None
+        self._schedule()
+        atexit.register(self.flush)
+
+    def _schedule(self):
+        def flush_loop():
+            try:
+                self.flush()
+            finally:
+                self._schedule()
+        self._timer = threading.Timer(self.flush_interval, flush_loop)
+        self._timer.name = 'access-stats'
+        self._timer.daemon = True
+        self._timer.start()
+
+    def record(self, course_code: str):
+        with self.lock:
+            self.counts[course_code] += 1
+
+    def flush(self):
+        """Add the buffered counts to the stored counts."""
+        with self.lock:
+            counts, self.counts = self.counts, Counter()
+        if counts:
+            increment_course_access(dict(counts))
@@ -1,20 +1,64 @@
-import boto3
 import datetime
+import json
+import threading
+import time
 from botocore.exceptions import ClientError
 import re
 from utils.core.logger import logger
 from utils.core.error_handling import catch_error
+from utils.data.cache_backend import shared_cache, invalidate_cache
 import io
 import uuid
 import streamlit as st
 
+class LazyClient:
+    """
+    Stands in for a boto3 client or resource, creating it on first use.
+    Importing boto3 and creating clients takes a noticeable part of a cold start,
+    so this is deferred until the first AWS call.
+    """
+    # Shared, as boto3's default session is not safe to create clients from concurrently
+    _lock = threading.RLock()
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._client = None
+
+    def _get(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._factory()
+        return self._client
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+def _boto3():
+    import boto3
+    return boto3
+
 # Initialize clients
-dynamodb = boto3.resource('dynamodb')
-dynamodb_client = boto3.client('dynamodb')  # Add client for transaction operations
-s3 = boto3.client('s3')
-course_table = dynamodb.Table('playlab-courses')
+dynamodb = LazyClient(lambda: _boto3().resource('dynamodb'))
+dynamodb_client = LazyClient(lambda: _boto3().client('dynamodb'))  # Add client for transaction operations
+s3 = LazyClient(lambda: _boto3().client('s3'))
+course_table = LazyClient(lambda: dynamodb.Table('playlab-courses'))
 bucket_name = 'playlab-courses-content'
 
+# Cache scopes (a write invalidates the scopes of the data it changed)
+COURSE_LISTINGS = 'listings'  # Course lists spanning several courses
+
+MODERATION_INDEX = 'moderation_status-index'  # GSI keyed on moderation_status, used to find pending sections
+BUNDLE_WRITE_ATTEMPTS = 3  # Rebuilds of a course bundle tried when other writers keep storing theirs first
+
+def course_scope(course_code, *args, **kwargs):
+    """Cache scope of a course's data. Takes the cached function's arguments, course code first."""
+    return f'course:{course_code}'
+
+def file_scope(file_path, *args, **kwargs):
+    """Cache scope of an S3 file: the course whose folder holds it."""
+    return course_scope(file_key(file_path).split('/')[0])
+
 def validate_course_code(code: str) -> bool:
     """
     Validate the course code format.
@@ -36,6 +80,7 @@ def validate_course_code(code: str) -> bool:
 
 # User operations
 @st.cache_data(ttl=3600, show_spinner=False)
+@shared_cache(ttl=3600, scope=COURSE_LISTINGS)
 def get_user_courses(email):
     """
     Retrieve all course codes for a specific user
@@ -87,7 +132,8 @@ def create_course(email, course_code, name, description, grade):
         }
         course_table.put_item(Item=metadata_item)
 
-        st.cache_data.clear()
+        refresh_course_bundle(course_code)
+        invalidate_cache(course_scope(course_code), COURSE_LISTINGS)
         return True
     except Exception as e:
         logger.error(f"Error creating course: {e}")
@@ -109,7 +155,8 @@ def delete_course(email, course_code):
                     'SK': item['SK']
                 }
             )
-        st.cache_data.clear()
+        delete_course_bundle(course_code)
+        invalidate_cache(course_scope(course_code), COURSE_LISTINGS)
         
         # Delete the user-course relationship
         course_table.delete_item(
@@ -118,7 +165,7 @@ def delete_course(email, course_code):
                 'SK': f'COURSE#{course_code}'
             }
         )
-        st.cache_data.clear()
+        invalidate_cache(course_scope(course_code), COURSE_LISTINGS)
         # Delete any associated S3 content
         try:
             # List all objects with the course prefix
@@ -137,7 +184,7 @@ def delete_course(email, course_code):
                         ]
                     }
                 )
-            st.cache_data.clear()
+            invalidate_cache(course_scope(course_code), COURSE_LISTINGS)
         except ClientError as e:
             logger.error(f"Error deleting S3 objects: {e}")
         
@@ -147,6 +194,7 @@ def delete_course(email, course_code):
         return False
 
 @st.cache_data(ttl=3600, show_spinner=False)
+@shared_cache(ttl=3600, scope=course_scope)
 def get_course_details(course_code):
     """
     Get all information related to a course including units and sections
@@ -160,6 +208,160 @@ def get_course_details(course_code):
     items = response.get('Items', [])
     return items
 
+# Course bundle operations
+def build_course_bundle(course_code):
+    """
+    Build the student view of a course directly from DynamoDB:
+    metadata plus ordered units and section summaries.
+    Returns None if the course does not exist.
+    """
+    # Consistent reads: the bundle is rebuilt right after a write and stored until the next one
+    items = course_table.query(
+        KeyConditionExpression='PK = :pk',
+        ExpressionAttributeValues={
+            ':pk': f'COURSE#{course_code}'
+        },
+        ConsistentRead=True
+    ).get('Items', [])
+    metadata = next((item for item in items if item['SK'] == 'METADATA'), None)
+    if not metadata:
+        return None
+
+    units = []
+    unit_items = sorted((item for item in items if item['SK'].startswith('UNIT#')), key=lambda x: x.get('order', 0))
+    for unit_item in unit_items:
+        unit_id = unit_item['SK'].replace('UNIT#', '')
+        section_items = course_table.query(
+            KeyConditionExpression='PK = :pk AND begins_with(SK, :sk_prefix)',
+            ProjectionExpression='SK, title, overview, #order, section_type, moderation_status',
+            ExpressionAttributeNames={
+                '#order': 'order'
+            },
+            ExpressionAttributeValues={
+                ':pk': f'COURSE#{course_code}#UNIT#{unit_id}',
+                ':sk_prefix': 'SECTION#'
+            },
+            ConsistentRead=True
+        ).get('Items', [])
+        section_items.sort(key=lambda x: x.get('order', 0))
+        units.append({
+            'id': unit_id,
+            'title': unit_item.get('title', ''),
+            'description': unit_item.get('description', ''),
+            'order': int(unit_item.get('order', 0)),
+            'sections': [
+                {
+                    'id': section_item['SK'].replace('SECTION#', ''),
+                    'title': section_item.get('title', ''),
+                    'overview': section_item.get('overview', ''),
+                    'order': int(section_item.get('order', 0)),
+                    'section_type': section_item.get('section_type', 'content'),
+                    'moderation_status': section_item.get('moderation_status', 'approved')
+                }
+                for section_item in section_items
+            ]
+        })
+
+    return {
+        'code': course_code,
+        'name': metadata.get('name', ''),
+        'description': metadata.get('description', ''),
+        'grade_level': int(metadata.get('grade_level', 6)),
+        'availability': metadata.get('availability', 'requires_code'),
+        'units': units
+    }
+
+def refresh_course_bundle(course_code):
+    """
+    Rebuild and store a course's bundle, incrementing its version.
+    Called by every write that changes the course structure.
+
+    The write only succeeds if the version is still the one read before the rebuild, so a
+    rebuild started before another writer's cannot overwrite it. On a conflict the bundle is
+    rebuilt again. If the bundle cannot be stored it is deleted, so the next read rebuilds it.
+    """
+    key = {
+        'PK': f'BUNDLE#{course_code}',
+        'SK': 'METADATA'
+    }
+    try:
+        for _ in range(BUNDLE_WRITE_ATTEMPTS):
+            item = course_table.get_item(
+                Key=key,
+                ProjectionExpression='version',
+                ConsistentRead=True
+            ).get('Item')
+            seen = int(item['version']) if item and 'version' in item else None
+
+            bundle = build_course_bundle(course_code)
+            if bundle is None:
+                delete_course_bundle(course_code)
+                return None
+
+            expr_attr_values = {
+                ':bundle': json.dumps(bundle, separators=(',', ':')),
+                ':version': (seen or 0) + 1
+            }
+            if seen is None:
+                condition = 'attribute_not_exists(version)'
+            else:
+                condition = 'version = :seen'
+                expr_attr_values[':seen'] = seen
+            try:
+                course_table.update_item(
+                    Key=key,
+                    UpdateExpression='SET bundle = :bundle, version = :version',
+                    ConditionExpression=condition,
+                    ExpressionAttributeValues=expr_attr_values
+                )
+            except ClientError as e:
+                if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                    continue
+                raise
+            bundle['version'] = expr_attr_values[':version']
+            return bundle
+        logger.warning(f"Course bundle for {course_code} kept changing, leaving it to be rebuilt on read")
+    except Exception as e:
+        logger.error(f"Error refreshing course bundle: {e}")
+    delete_course_bundle(course_code)
+    return None
+
+def delete_course_bundle(course_code):
+    """
+    Delete a course's bundle
+    """
+    try:
+        course_table.delete_item(
+            Key={
+                'PK': f'BUNDLE#{course_code}',
+                'SK': 'METADATA'
+            }
+        )
+    except Exception as e:
+        logger.error(f"Error deleting course bundle: {e}")
+
+@st.cache_data(ttl=3600, show_spinner=False)
+@shared_cache(ttl=3600, scope=course_scope)
+def get_course_bundle(course_code):
+    """
+    Get the precomputed student view of a course in a single read.
+    Bundles are built on first access for courses that predate them.
+    Returns:
+        dict: Course metadata, ordered units and section summaries plus a version number, or None
+    """
+    response = course_table.get_item(
+        Key={
+            'PK': f'BUNDLE#{course_code}',
+            'SK': 'METADATA'
+        }
+    )
+    item = response.get('Item')
+    if not item:
+        return refresh_course_bundle(course_code)
+    bundle = json.loads(item['bundle'])
+    bundle['version'] = int(item.get('version', 0))
+    return bundle
+
 def get_all_courses():
     """
     Get all courses across all users (for admin purposes)
@@ -210,10 +412,12 @@ def create_unit(course_code, unit_id, title, description, order):
             'order': order
         }
     )
-    st.cache_data.clear()
+    refresh_course_bundle(course_code)
+    invalidate_cache(course_scope(course_code))
     return True
 
 @st.cache_data(ttl=3600, show_spinner=False)
+@shared_cache(ttl=3600, scope=course_scope)
 def get_course_units(course_code):
     """
     Get all units for a specific course
@@ -243,7 +447,8 @@ def update_unit(course_code, unit_id, title, description):
                 ':desc': description
             }
         )
-        st.cache_data.clear()
+        refresh_course_bundle(course_code)
+        invalidate_cache(course_scope(course_code))
         return True
     except Exception as e:
         logger.error(f"Error updating unit: {e}")
@@ -305,10 +510,12 @@ def create_section(course_code, unit_id, section_id, title, overview, order, sec
         item['content'] = content
         
     course_table.put_item(Item=item)
-    st.cache_data.clear()
+    refresh_course_bundle(course_code)
+    invalidate_cache(course_scope(course_code))
     return True
 
 @st.cache_data(ttl=3600, show_spinner=False)
+@shared_cache(ttl=3600, scope=course_scope)
 def get_unit_sections(course_code, unit_id):
     """
     Get all sections for a specific unit
@@ -370,7 +577,8 @@ def delete_section(course_code, unit_id, section_id):
         if section_orders:
             update_section_orders(course_code, unit_id, section_orders)
             
-        st.cache_data.clear()
+        refresh_course_bundle(course_code)
+        invalidate_cache(course_scope(course_code))
         return True
     except Exception as e:
         logger.error(f"Error deleting section: {e}")
@@ -418,12 +626,135 @@ def update_section(course_code, unit_id, section_id, title=None, overview=None,
             UpdateExpression=update_expression,
             ExpressionAttributeValues=expr_attr_values
         )
-        st.cache_data.clear()
+        refresh_course_bundle(course_code)
+        invalidate_cache(course_scope(course_code))
         return True
     except Exception as e:
         logger.error(f"Error updating section: {e}")
         return False
 
+def set_section_moderation(course_code, unit_id, section_id, status, feedback='', content_hash=None, expected_hash=None):
+    """
+    Set a section's moderation status ('pending', 'approved' or 'rejected')
+    Args:
+        content_hash: Hash of the content under review, stored with a pending status
+        expected_hash: Only apply the status if the section still holds this content,
+            so a verdict for an older save never overwrites a newer one
+    Returns:
+        bool: True if the status was applied
+    """
+    try:
+        update_expression = 'SET moderation_status = :status, moderation_feedback = :feedback'
+        expr_attr_values = {
+            ':status': status,
+            ':feedback': feedback
+        }
+        if content_hash is not None:
+            update_expression += ', moderation_hash = :hash'
+            expr_attr_values[':hash'] = content_hash
+        if status == 'pending':
+            # The saving process moderates the section itself, so recovery elsewhere leaves it alone
+            update_expression += ', moderation_claimed_at = :claimed'
+            expr_attr_values[':claimed'] = int(time.time())
+        else:
+            update_expression += ' REMOVE moderation_claimed_at'
+        kwargs = {}
+        if expected_hash is not None:
+            kwargs['ConditionExpression'] = 'moderation_hash = :expected'
+            expr_attr_values[':expected'] = expected_hash
+
+        course_table.update_item(
+            Key={
+                'PK': f'COURSE#{course_code}#UNIT#{unit_id}',
+                'SK': f'SECTION#{section_id}'
+            },
+            UpdateExpression=update_expression,
+            ExpressionAttributeValues=expr_attr_values,
+            **kwargs
+        )
+        refresh_course_bundle(course_code)
+        invalidate_cache(course_scope(course_code))
+        return True
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            logger.info(f"Skipping stale moderation verdict for section {section_id}")
+        else:
+            logger.error(f"Error setting section moderation: {e}")
+        return False
+    except Exception as e:
+        logger.error(f"Error setting section moderation: {e}")
+        return False
+
+def get_pending_sections():
+    """
+    Get the sections waiting for moderation, across all courses.
+    Reads the MODERATION_INDEX global secondary index (partition key moderation_status,
+    all attributes projected), so only pending sections are read.
+    Returns:
+        list: Section items, each with its 'course_code' and 'unit_id' added
+    """
+    sections = []
+    try:
+        query_kwargs = {
+            'IndexName': MODERATION_INDEX,
+            'KeyConditionExpression': 'moderation_status = :pending',
+            'ExpressionAttributeValues': {
+                ':pending': 'pending'
+            }
+        }
+        while True:
+            response = course_table.query(**query_kwargs)
+            for item in response.get('Items', []):
+                # PK format is: COURSE#{course_code}#UNIT#{unit_id}
+                parts = item['PK'].split('#')
+                if len(parts) == 4 and item['SK'].startswith('SECTION#'):
+                    sections.append({**item, 'course_code': parts[1], 'unit_id': parts[3]})
+            if 'LastEvaluatedKey' not in response:
+                break
+            query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    except Exception as e:
+        logger.error(f"Error getting pending sections: {e}")
+    return sections
+
+def claim_section_moderation(course_code, unit_id, section_id, lease_seconds, content_hash=None):
+    """
+    Claim a pending section for moderation by this process, unless another process
+    claimed it less than lease_seconds ago
+    Args:
+        content_hash: Hash of the content under review, stored if the section has none yet
+    Returns:
+        bool: True if the section was claimed
+    """
+    now = int(time.time())
+    update_expression = 'SET moderation_claimed_at = :now'
+    expr_attr_values = {
+        ':now': now,
+        ':stale': now - lease_seconds,
+        ':pending': 'pending'
+    }
+    if content_hash is not None:
+        update_expression += ', moderation_hash = if_not_exists(moderation_hash, :hash)'
+        expr_attr_values[':hash'] = content_hash
+    try:
+        course_table.update_item(
+            Key={
+                'PK': f'COURSE#{course_code}#UNIT#{unit_id}',
+                'SK': f'SECTION#{section_id}'
+            },
+            UpdateExpression=update_expression,
+            ConditionExpression='moderation_status = :pending AND '
+                                '(attribute_not_exists(moderation_claimed_at) OR moderation_claimed_at < :stale)',
+            ExpressionAttributeValues=expr_attr_values
+        )
+        return True
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            logger.error(f"Error claiming section moderation: {e}")
+        return False
+    except Exception as e:
+        logger.error(f"Error claiming section moderation: {e}")
+        return False
+
 def update_section_orders(course_code, unit_id, section_orders):
     """
     Update the order of multiple sections within a unit
@@ -449,7 +780,8 @@ def update_section_orders(course_code, unit_id, section_orders):
                     ':order': new_order
                 }
             )
-        st.cache_data.clear()
+        refresh_course_bundle(course_code)
+        invalidate_cache(course_scope(course_code))
         return True
     except Exception as e:
         logger.error(f"Error updating section orders: {e}")
@@ -463,7 +795,7 @@ def upload_content_file(file_data, course_code, file_name):
     key = f'{course_code}/{file_name}'
     try:
         s3.upload_fileobj(file_data, bucket_name, key)
-        st.cache_data.clear()
+        invalidate_cache(course_scope(course_code))
         return f'https://{bucket_name}.s3.amazonaws.com/{key}'
     except ClientError as e:
         logger.error(f"Error uploading file: {e}")
@@ -476,7 +808,7 @@ def delete_content_file(course_code, file_name):
     key = f'{course_code}/{file_name}'
     try:
         s3.delete_object(Bucket=bucket_name, Key=key)
-        st.cache_data.clear()
+        invalidate_cache(course_scope(course_code))
         return True
     except ClientError as e:
         logger.error(f"Error deleting file: {e}")
@@ -512,7 +844,7 @@ def update_course(email, course_code, name, description, grade, availability=Non
             },
             ExpressionAttributeValues=expr_values
         )
-        st.cache_data.clear()
+        invalidate_cache(course_scope(course_code), COURSE_LISTINGS)
         
         # Update course metadata
         course_table.update_item(
@@ -527,7 +859,8 @@ def update_course(email, course_code, name, description, grade, availability=Non
             },
             ExpressionAttributeValues=expr_values
         )
-        st.cache_data.clear()
+        refresh_course_bundle(course_code)
+        invalidate_cache(course_scope(course_code), COURSE_LISTINGS)
         return True
     except Exception as e:
         logger.error(f"Error updating course: {e}")
@@ -580,7 +913,8 @@ def delete_unit(course_code, unit_id):
         if unit_orders:
             update_unit_orders(course_code, unit_orders)
             
-        st.cache_data.clear()
+        refresh_course_bundle(course_code)
+        invalidate_cache(course_scope(course_code))
         return True
     except Exception as e:
         logger.error(f"Error deleting unit: {e}")
@@ -610,7 +944,8 @@ def update_unit_orders(course_code, unit_orders):
                     ':order': new_order
                 }
             )
-        st.cache_data.clear()
+        refresh_course_bundle(course_code)
+        invalidate_cache(course_scope(course_code))
         return True
     except Exception as e:
         logger.error(f"Error updating unit orders: {e}")
@@ -760,14 +1095,26 @@ def copy_course_contents(source_course_code, target_course_code):
             }
             course_table.put_item(Item=assistant_item)
         
-        st.cache_data.clear()
+        refresh_course_bundle(target_course_code)
+        invalidate_cache(course_scope(target_course_code))
         return True
         
     except Exception as e:
         logger.error(f"Error copying course contents: {e}")
         return False
 
+def file_key(file_path):
+    """
+    Get the S3 key of a file path (can be full URL or just the key)
+    """
+    # Extract the key from the URL if it's a full URL
+    if file_path.startswith('http'):
+        # Remove the bucket name and domain from the URL
+        return file_path.split(f'{bucket_name}.s3.amazonaws.com/')[-1]
+    return file_path
+
 @st.cache_data(ttl=3600, show_spinner=False)
+@shared_cache(ttl=3600, scope=file_scope)
 def get_file_content(file_path):
     """
     Retrieve file content from S3
@@ -777,22 +1124,35 @@ def get_file_content(file_path):
         The file content as bytes, or None if the file doesn't exist
     """
     try:
-        # Extract the key from the URL if it's a full URL
-        if file_path.startswith('http'):
-            # Remove the bucket name and domain from the URL
-            key = file_path.split(f'{bucket_name}.s3.amazonaws.com/')[-1]
-        else:
-            key = file_path
-
         response = s3.get_object(
             Bucket=bucket_name,
-            Key=key
+            Key=file_key(file_path)
         )
         return response['Body'].read()
     except ClientError as e:
         logger.error(f"Error retrieving file content: {e}")
         return None
 
+@st.cache_data(ttl=300, show_spinner=False)
+@shared_cache(ttl=300, scope=file_scope)
+def get_file_etag(file_path):
+    """
+    Get the ETag of a file in S3, which changes whenever the file is replaced
+    Args:
+        file_path: The S3 file path (can be full URL or just the key)
+    Returns:
+        The ETag, or None if the file doesn't exist
+    """
+    try:
+        response = s3.head_object(
+            Bucket=bucket_name,
+            Key=file_key(file_path)
+        )
+        return response['ETag'].strip('"')
+    except ClientError as e:
+        logger.error(f"Error retrieving file metadata: {e}")
+        return None
+
 def create_custom_assistant(course_code, name, instructions):
     """
     Create a new custom AI assistant for a course
@@ -810,13 +1170,14 @@ def create_custom_assistant(course_code, name, instructions):
                 'created_at': str(datetime.datetime.now())
             }
         )
-        st.cache_data.clear()
+        invalidate_cache(course_scope(course_code))
         return assistant_id
     except Exception as e:
         logger.error(f"Error creating custom assistant: {e}")
         return None
 
 @st.cache_data(ttl=3600, show_spinner=False)
+@shared_cache(ttl=3600, scope=course_scope)
 def get_custom_assistants(course_code):
     """
     Get all custom AI assistants for a course
@@ -845,7 +1206,7 @@ def delete_custom_assistant(course_code, assistant_id):
                 'SK': f'ASSISTANT#{assistant_id}'
             }
         )
-        st.cache_data.clear()
+        invalidate_cache(course_scope(course_code))
         return True
     except Exception as e:
         logger.error(f"Error deleting custom assistant: {e}")
@@ -868,7 +1229,7 @@ def update_section_assistant(course_code, unit_id, section_id, assistant_id):
             ReturnValues='ALL_NEW'
         )
         
-        st.cache_data.clear()
+        invalidate_cache(course_scope(course_code))
         return True
     except Exception as e:
         logger.error(f"Error updating section assistant: {e}")
@@ -910,6 +1271,7 @@ def get_section_location(section_id):
         return None, None
 
 @st.cache_data(ttl=3600, show_spinner=False)
+@shared_cache(ttl=3600, scope=COURSE_LISTINGS)
 def get_open_courses():
     """
     Get all courses that are marked as 'open_to_all'
@@ -931,4 +1293,90 @@ def get_open_courses():
         return response.get('Items', [])
     except Exception as e:
         logger.error(f"Error getting open courses: {e}")
-        return [] 
\ No newline at end of file
+        return [] 
+def get_moderation_verdict(content_hash):
+    """
+    Get a stored moderation verdict for a content hash
+    Args:
+        content_hash: Hash of the moderated content, grade level and moderator prompt version
+    Returns:
+        dict: Item with 'approved' and 'feedback', or None if the content was never moderated
+    """
+    try:
+        response = course_table.get_item(
+            Key={
+                'PK': f'MODERATION#{content_hash}',
+                'SK': 'METADATA'
+            }
+        )
+        return response.get('Item')
+    except Exception as e:
+        logger.error(f"Error getting moderation verdict: {e}")
+        return None
+
+def put_moderation_verdict(content_hash, approved, feedback, prompt_version):
+    """
+    Store a moderation verdict for a content hash
+    """
+    try:
+        course_table.put_item(
+            Item={
+                'PK': f'MODERATION#{content_hash}',
+                'SK': 'METADATA',
+                'approved': approved,
+                'feedback': feedback,
+                'prompt_version': str(prompt_version),
+                'created_at': str(datetime.datetime.now())
+            }
+        )
+        return True
+    except Exception as e:
+        logger.error(f"Error storing moderation verdict: {e}")
+        return False
+
+def increment_course_access(counts):
+    """
+    Add to the access counts of courses
+    Args:
+        counts: Dictionary of course code to number of new accesses
+    """
+    for course_code, count in counts.items():
+        try:
+            course_table.update_item(
+                Key={
+                    'PK': 'STATS#ACCESS',
+                    'SK': f'COURSE#{course_code}'
+                },
+                UpdateExpression='ADD access_count :count',
+                ExpressionAttributeValues={
+                    ':count': count
+                }
+            )
+        except Exception as e:
+            logger.error(f"Error updating access count of {course_code}: {e}")
+
+def get_top_courses(limit):
+    """
+    Get the most accessed courses
+    Args:
+        limit: Maximum number of courses to return
+    Returns:
+        list: Course codes, most accessed first
+    """
+    try:
+        items = []
+        kwargs = {
+            'KeyConditionExpression': 'PK = :pk',
+            'ExpressionAttributeValues': {':pk': 'STATS#ACCESS'}
+        }
+        while True:
+            response = course_table.query(**kwargs)
+            items.extend(response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                break
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        items.sort(key=lambda item: int(item.get('access_count', 0)), reverse=True)
+        return [item['SK'].replace('COURSE#', '') for item in items[:limit]]
+    except Exception as e:
+        logger.error(f"Error getting top courses: {e}")
+        return []
@@ -0,0 +1,291 @@
+import os
+import sys
+import time
+import pickle
+import sqlite3
+import threading
+import functools
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import streamlit as st
+
+from utils.core.config import open_config
+from utils.core.logger import logger
+
+# Constants
+DEFAULT_TTL = 3600  # 1 hour (matches the st.cache_data ttl used by the data layer)
+PURGE_EVERY = 100  # Remove expired entries once every this many writes
+GLOBAL_SCOPE = '*'  # Scope of entries that every invalidation drops
+INVALIDATION_LOG_SIZE = 1000  # Invalidations kept for other processes to replay
+
+@st.cache_resource(show_spinner=False)
+def get_cache_backend():
+    """Singleton cache backend selected by config/cache.yaml."""
+    config = open_config().get('cache', {})
+    backend = config.get('backend', 'memory')
+    if backend == 'sqlite':
+        try:
+            return SQLiteCacheBackend(config.get('path', SQLiteCacheBackend.DEFAULT_PATH))
+        except sqlite3.Error as e:
+            logger.error(f"SQLite cache unavailable, falling back to memory cache: {e}")
+    return MemoryCacheBackend()
+
+@st.cache_resource(show_spinner=False)
+def get_process_cache_index():
+    """Singleton instance of ProcessCacheIndex."""
+    return ProcessCacheIndex()
+
+def shared_cache(ttl: int = DEFAULT_TTL, scope: Union[str, Callable[..., str]] = GLOBAL_SCOPE):
+    """
+    Cache a data-layer function's results in the shared cache backend.
+
+    Meant to sit underneath st.cache_data: st.cache_data keeps a fast per-process
+    copy while the backend lets every worker process on the host reuse the result.
+
+    Args:
+        ttl (int): Time to live of cached results in seconds
+        scope (str or callable): Scope the results belong to, or a function of the cached
+            function's arguments returning it. invalidate_cache() drops entries by scope.
+    """
+    def decorator(func):
+        prefix = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            backend = get_cache_backend()
+            entry_scope = scope(*args, **kwargs) if callable(scope) else scope
+            key = f"{prefix}:{args!r}:{sorted(kwargs.items())!r}"
+            # Reached on every st.cache_data miss, so this sees every entry st.cache_data holds
+            get_process_cache_index().record(entry_scope, key, func, args, kwargs)
+            hit, value = backend.get(key)
+            if hit:
+                return value
+            generation = backend.generation()
+            value = func(*args, **kwargs)
+            backend.set(key, value, ttl, entry_scope, generation)
+            return value
+        return wrapper
+    return decorator
+
+def invalidate_cache(*scopes: str):
+    """
+    Drop cached data in the given scopes, and entries cached without a scope, in this
+    process and in every process sharing the cache backend.
+
+    Args:
+        *scopes (str): Scopes whose data changed
+    """
+    get_cache_backend().invalidate(scopes)
+    get_process_cache_index().clear(scopes)
+    sync_cache_generation()
+
+def sync_cache_generation():
+    """Drop this process's st.cache_data entries that other processes invalidated. Call on every rerun."""
+    backend = get_cache_backend()
+    index = get_process_cache_index()
+    generation = backend.generation()
+    if index.seen != generation:
+        if index.seen is not None:
+            scopes = backend.invalidations_since(index.seen)
+            if scopes is None:
+                index.clear_all()
+            else:
+                index.clear(scopes)
+        index.seen = generation
+
+def _cached_function(module: str, qualname: str):
+    """The object a cached function is published as, st.cache_data wrapper included."""
+    obj = sys.modules.get(module)
+    for name in qualname.split('.'):
+        obj = getattr(obj, name, None)
+    return obj
+
+# ---------------------------- ProcessCacheIndex Implementation ----------------------------
+class ProcessCacheIndex:
+    def __init__(self):
+        """
+        Arguments of the st.cache_data entries held by this process, grouped by scope,
+        so an invalidation clears only the entries of the scopes that changed.
+        """
+        self.lock = threading.Lock()
+        self.scopes: Dict[str, Dict[str, tuple]] = {}
+        self.seen: Optional[int] = None  # Last shared cache generation this process synced to
+
+    def record(self, scope: str, key: str, func, args: tuple, kwargs: dict):
+        with self.lock:
+            self.scopes.setdefault(scope, {})[key] = (func.__module__, func.__qualname__, args, kwargs)
+
+    def clear(self, scopes: Iterable[str]):
+        with self.lock:
+            entries = [entry for scope in set(scopes) | {GLOBAL_SCOPE}
+                       for entry in self.scopes.pop(scope, {}).values()]
+        for module, qualname, args, kwargs in entries:
+            cached = _cached_function(module, qualname)
+            if hasattr(cached, 'clear'):
+                cached.clear(*args, **kwargs)
+
+    def clear_all(self):
+        with self.lock:
+            self.scopes.clear()
+        st.cache_data.clear()
+
+# ---------------------------- CacheBackend Implementations ----------------------------
+class CacheBackend(ABC):
+    """Interface for data-layer cache backends."""
+
+    @abstractmethod
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (hit, value) for a key."""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: int, scope: str = GLOBAL_SCOPE, generation: Optional[int] = None):
+        """Store a value. Skipped if its scope was invalidated since `generation` was read."""
+
+    @abstractmethod
+    def invalidate(self, scopes: Iterable[str]):
+        """Drop the entries of the scopes and unscoped entries, and advance the generation."""
+
+    @abstractmethod
+    def generation(self) -> int:
+        """Counter that advances on every invalidation."""
+
+    @abstractmethod
+    def invalidations_since(self, generation: int) -> Optional[List[str]]:
+        """Scopes invalidated after `generation`, or None if they are no longer known."""
+
+class MemoryCacheBackend(CacheBackend):
+    def __init__(self):
+        """Process-local cache. Equivalent to running without a shared backend."""
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.log = deque(maxlen=INVALIDATION_LOG_SIZE)  # (generation, scope) of recent invalidations
+        self._generation = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[1] < time.time():
+                return False, None
+            return True, entry[0]
+
+    def set(self, key, value, ttl, scope=GLOBAL_SCOPE, generation=None):
+        with self.lock:
+            if generation is not None and any(
+                    seq > generation and (scope == GLOBAL_SCOPE or logged == scope) for seq, logged in self.log):
+                return
+            self.entries[key] = (value, time.time() + ttl, scope)
+
+    def invalidate(self, scopes):
+        scopes = set(scopes)
+        with self.lock:
+            self.entries = {key: entry for key, entry in self.entries.items()
+                            if entry[2] not in scopes and entry[2] != GLOBAL_SCOPE}
+            for scope in scopes or {GLOBAL_SCOPE}:
+                self._generation += 1
+                self.log.append((self._generation, scope))
+
+    def generation(self):
+        return self._generation
+
+    def invalidations_since(self, generation):
+        with self.lock:
+            if self.log and generation < self.log[0][0] - 1:
+                return None
+            return [scope for seq, scope in self.log if seq > generation]
+
+class SQLiteCacheBackend(CacheBackend):
+    DEFAULT_PATH = "/tmp/opencourse_cache.sqlite3"
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        """Cache shared by all processes on the host, stored in an SQLite database in WAL mode."""
+        self.path = path
+        self.local = threading.local()
+        self.writes = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS cache_entries "
+                         "(key TEXT PRIMARY KEY, value BLOB, expires REAL, scope TEXT)")
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_entries_scope ON cache_entries (scope)")
+            conn.execute("CREATE TABLE IF NOT EXISTS invalidations (seq INTEGER PRIMARY KEY AUTOINCREMENT, scope TEXT)")
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread."""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def get(self, key):
+        try:
+            row = self._conn().execute(
+                "SELECT value FROM cache_entries WHERE key = ? AND expires > ?", (key, time.time())
+            ).fetchone()
+            if row is None:
+                return False, None
+            return True, pickle.loads(row[0])
+        except (sqlite3.Error, pickle.PickleError, EOFError) as e:
+            logger.error(f"Shared cache read failed: {e}")
+            return False, None
+
+    def set(self, key, value, ttl, scope=GLOBAL_SCOPE, generation=None):
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            conn = self._conn()
+            now = time.time()
+            # Only store the value if no process invalidated its scope while it was being fetched
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires, scope) "
+                "SELECT ?, ?, ?, ? WHERE ? IS NULL OR NOT EXISTS "
+                "(SELECT 1 FROM invalidations WHERE seq > ? AND (? = ? OR scope = ?))",
+                (key, sqlite3.Binary(blob), now + ttl, scope, generation, generation, scope, GLOBAL_SCOPE, scope)
+            )
+            self.writes += 1
+            if self.writes % PURGE_EVERY == 0:
+                conn.execute("DELETE FROM cache_entries WHERE expires <= ?", (now,))
+        except (sqlite3.Error, pickle.PickleError) as e:
+            logger.error(f"Shared cache write failed: {e}")
+
+    def invalidate(self, scopes):
+        scopes = sorted(set(scopes)) or [GLOBAL_SCOPE]
+        try:
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                placeholders = ', '.join('?' * len(scopes))
+                conn.execute(f"DELETE FROM cache_entries WHERE scope IN ({placeholders}) OR scope = ?",
+                             (*scopes, GLOBAL_SCOPE))
+                conn.executemany("INSERT INTO invalidations (scope) VALUES (?)", [(scope,) for scope in scopes])
+                conn.execute("DELETE FROM invalidations WHERE seq <= (SELECT MAX(seq) FROM invalidations) - ?",
+                             (INVALIDATION_LOG_SIZE,))
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            logger.error(f"Shared cache invalidation failed: {e}")
+
+    def generation(self):
+        try:
+            row = self._conn().execute("SELECT MAX(seq) FROM invalidations").fetchone()
+            return row[0] or 0
+        except sqlite3.Error as e:
+            logger.error(f"Shared cache generation read failed: {e}")
+            return 0
+
+    def invalidations_since(self, generation):
+        try:
+            conn = self._conn()
+            oldest = conn.execute("SELECT MIN(seq) FROM invalidations").fetchone()[0]
+            if oldest is not None and generation < oldest - 1:
+                return None
+            rows = conn.execute("SELECT DISTINCT scope FROM invalidations WHERE seq > ?", (generation,)).fetchall()
+            return [row[0] for row in rows]
+        except sqlite3.Error as e:
+            logger.error(f"Shared cache invalidation read failed: {e}")
+            return None
@@ -1,8 +1,11 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from typing import List, Optional
 import streamlit as st
-from utils.data.aws import get_course_details, get_course_units, get_unit_sections, course_table, get_custom_assistants, get_section_location, get_file_content, get_open_courses
-from utils.core.config import open_config
+from utils.data.aws import (get_course_bundle, course_table, get_custom_assistants, get_section_location, get_file_content,
+                            get_open_courses, course_scope, COURSE_LISTINGS)
+from utils.core.config import playlab_config
+from utils.data.cache_backend import shared_cache, invalidate_cache, GLOBAL_SCOPE
+from utils.data.access_stats import record_course_access
 
 @dataclass
 class Section:
@@ -18,6 +21,8 @@ class Section:
     assistant_id: Optional[str] = None
     assistant_name: Optional[str] = None
     assistant_instructions: Optional[str] = None
+    moderation_status: str = 'approved'
+    moderation_feedback: str = ''
 
 @dataclass
 class SectionSmall:
@@ -36,6 +41,7 @@ class SectionSummary:
     section_type: str
     unit_id: str
     unit_title: str
+    moderation_status: str = 'approved'
 
 @dataclass
 class Unit:
@@ -53,62 +59,50 @@ class Course:
     grade_level: int
     availability: str
     units: List[Unit]
+    version: int = 0
 
 class CourseManager:
     
     @staticmethod
     @st.cache_data(ttl=3600, show_spinner=False)
+    @shared_cache(ttl=3600, scope=course_scope)
     def get_course(course_code: str) -> Course:
-        """Get complete course structure with caching"""
-        # Get course details
-        course_details = get_course_details(course_code)
-        metadata = next((item for item in course_details if item["SK"] == "METADATA"), None)
-        
-        if not metadata:
+        """Get complete course structure from the course's precomputed bundle"""
+        bundle = get_course_bundle(course_code)
+        if not bundle:
             return None
-            
-        # Get units
-        units_data = get_course_units(course_code)
-        units_data.sort(key=lambda x: x.get('order', 0))
         
         units = []
-        for unit_data in units_data:
-            unit_id = unit_data['SK'].replace('UNIT#', '')
-            
-            # Get sections for this unit
-            sections_data = get_unit_sections(course_code, unit_id)
-            sections_data.sort(key=lambda x: x.get('order', 0))
-            
-            sections = []
-            for section_data in sections_data:
-                section_id = section_data['SK'].replace('SECTION#', '')
-                section = SectionSummary(
-                    id=section_id,
-                    title=section_data.get('title', ''),
-                    overview=section_data.get('overview', ''),
-                    order=section_data.get('order', 0),
-                    section_type=section_data.get('section_type', 'content'),
-                    unit_id=unit_id,
-                    unit_title=unit_data.get('title', '')
+        for unit_data in bundle['units']:
+            sections = [
+                SectionSummary(
+                    id=section_data['id'],
+                    title=section_data['title'],
+                    overview=section_data['overview'],
+                    order=section_data['order'],
+                    section_type=section_data['section_type'],
+                    unit_id=unit_data['id'],
+                    unit_title=unit_data['title'],
+                    moderation_status=section_data.get('moderation_status', 'approved')
                 )
-                sections.append(section)
-            
-            unit = Unit(
-                id=unit_id,
-                title=unit_data.get('title', ''),
-                description=unit_data.get('description', ''),
-                order=unit_data.get('order', 0),
+                for section_data in unit_data['sections']
+            ]
+            units.append(Unit(
+                id=unit_data['id'],
+                title=unit_data['title'],
+                description=unit_data['description'],
+                order=unit_data['order'],
                 sections=sections
-            )
-            units.append(unit)
+            ))
         
         return Course(
             code=course_code,
-            name=metadata.get('name', ''),
-            description=metadata.get('description', ''),
-            grade_level=metadata.get('grade_level', 6),
-            availability=metadata.get('availability', 'requires_code'),
-            units=units
+            name=bundle['name'],
+            description=bundle['description'],
+            grade_level=bundle['grade_level'],
+            availability=bundle['availability'],
+            units=units,
+            version=bundle['version']
         )
     
     @staticmethod
@@ -122,19 +116,30 @@ class CourseManager:
                 'course_description': course.description,
                 'grade_level': course.grade_level,
                 'course_availability': course.availability,
-                'course_units': course.units
+                'course_units': course.units,
+                'course_version': course.version
             })
+            record_course_access(course.code)
             return True
         else:
             return False
     
     @staticmethod
-    @st.cache_data(ttl=3600, show_spinner=False)
     def get_section(course_code: str, unit_id: str, section_id: str) -> Optional[Section]:
         """
         Get a specific section by course code, unit ID, and section ID.
-        Results are cached for 1 hour.
+        Results are cached for 1 hour; the default assistant's prompt is read from the current config.
         """
+        section = CourseManager._load_section(course_code, unit_id, section_id)
+        if section and section.assistant_id and 'default' in section.assistant_id.lower():
+            section = replace(section, assistant_instructions=playlab_config().default_system_prompt)
+        return section
+
+    @staticmethod
+    @st.cache_data(ttl=3600, show_spinner=False)
+    @shared_cache(ttl=3600, scope=course_scope)
+    def _load_section(course_code: str, unit_id: str, section_id: str) -> Optional[Section]:
+        """Section from DynamoDB, with the default assistant's instructions left to get_section."""
         # Get section details from AWS
         response = course_table.get_item(
             Key={
@@ -153,7 +158,6 @@ class CourseManager:
         assistant_instructions = None
         if assistant_id:
             if 'default' in assistant_id.lower():
-                assistant_instructions = open_config()['playlab']['student_assistant_default_system_prompt']
                 assistant_name = 'Default'
             else:
                 # Get assistant details from custom assistants
@@ -165,13 +169,13 @@ class CourseManager:
                         break
         
         # Create and return Section object
-        # Get unit title from course units in session state if available
+        # Get unit title from the course bundle, so the cached section does not depend on the session
         unit_title = ''
-        if 'course_units' in st.session_state:
-            for unit in st.session_state.course_units:
-                if unit.id == unit_id:
-                    unit_title = unit.title
-                    break
+        bundle = get_course_bundle(course_code)
+        for unit in (bundle or {}).get('units', []):
+            if unit['id'] == unit_id:
+                unit_title = unit['title']
+                break
 
         return Section(
             id=section_id,
@@ -185,7 +189,9 @@ class CourseManager:
             assistant_name=assistant_name,
             assistant_instructions=assistant_instructions,
             unit_id=unit_id,
-            unit_title=unit_title
+            unit_title=unit_title,
+            moderation_status=section_data.get('moderation_status', 'approved'),
+            moderation_feedback=section_data.get('moderation_feedback', '')
         )
     
     def initialize_section(course_code: str, unit_id: str, section_id: str):
@@ -211,12 +217,13 @@ class CourseManager:
     
     
     @staticmethod
-    def clear_cache():
-        """Clear the course cache"""
-        st.cache_data.clear()
+    def clear_cache(course_code: str):
+        """Clear the cached data of a course"""
+        invalidate_cache(course_scope(course_code), COURSE_LISTINGS)
 
     @staticmethod
     @st.cache_data(ttl=3600, show_spinner=False)
+    @shared_cache(ttl=3600, scope=GLOBAL_SCOPE)  # Built from several courses, so dropped on any change
     def get_open_courses() -> List[Course]:
         """
         Get all courses that are marked as 'open_to_all'
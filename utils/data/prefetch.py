@@ -0,0 +1,106 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from utils.core.logger import logger
+from utils.data.aws import get_file_content
+from utils.data.course_manager import CourseManager
+
+# Constants
+PREFETCH_WORKERS = 2  # Background threads warming sections
+PREFETCH_NEIGHBOURS = 1  # Sections warmed on each side of the open one
+MAX_PENDING = 16  # Queued prefetches across all sessions; further requests are dropped
+
+@st.cache_resource(show_spinner=False)
+def get_prefetcher():
+    """Singleton instance of SectionPrefetcher."""
+    return SectionPrefetcher()
+
+def neighbour_sections(units, section_id: str, distance: int = PREFETCH_NEIGHBOURS) -> List[Tuple[str, str]]:
+    """
+    The sections before and after a section in course order (units in order, then sections
+    in order), nearest first. Sections hidden from students are skipped.
+
+    Returns:
+        list: (unit_id, section_id) pairs
+    """
+    ordered = [(unit.id, section.id) for unit in units for section in unit.sections
+               if section.moderation_status != 'rejected']
+    index = next((i for i, (_, sid) in enumerate(ordered) if sid == section_id), None)
+    if index is None:
+        return []
+    neighbours = []
+    for step in range(1, distance + 1):
+        if index + step < len(ordered):
+            neighbours.append(ordered[index + step])
+        if index - step >= 0:
+            neighbours.append(ordered[index - step])
+    return neighbours
+
+def prefetch_neighbours():
+    """
+    Warm the cache with the sections around the one in the session state, so that stepping
+    through a unit does not wait on DynamoDB and S3. Call after the section has rendered.
+    """
+    section = st.session_state.get('section')
+    course_code = st.session_state.get('course_code')
+    units = st.session_state.get('course_units')
+    if section is None or not course_code or not units:
+        return
+    # Reruns of the same section (e.g. chat messages) do not queue the loads again
+    if st.session_state.get('prefetched_section') == (course_code, section.id):
+        return
+    st.session_state['prefetched_section'] = (course_code, section.id)
+    ctx = get_script_run_ctx()
+    client_id = ctx.session_id if ctx else ''
+    get_prefetcher().prefetch(client_id, course_code, neighbour_sections(units, section.id))
+
+# ---------------------------- SectionPrefetcher Implementation ----------------------------
+class SectionPrefetcher:
+    def __init__(self, workers: int = PREFETCH_WORKERS, max_pending: int = MAX_PENDING):
+        """
+        Loads sections (item and PDF) into the data caches on background threads.
+
+        At most `max_pending` loads are queued at once. A session's queued loads are
+        cancelled when it requests new ones, so only the sections around the one it
+        is currently viewing are loaded.
+        """
+        self.max_pending = max_pending
+        self.lock = threading.Lock()
+        self.pending: Dict[str, List[Future]] = {}
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='section-prefetch')
+
+    def _load(self, course_code: str, unit_id: str, section_id: str):
+        try:
+            section = CourseManager.get_section(course_code, unit_id, section_id)
+            if section is not None and section.section_type == 'file' and section.file_path:
+                get_file_content(section.file_path)
+        except Exception as e:
+            logger.warning(f"Prefetch of section {section_id} failed: {e}")
+
+    def _pending_count(self) -> int:
+        """Loads queued or running, forgetting sessions whose loads have all finished. Call with the lock held."""
+        for client_id in [c for c, futures in self.pending.items() if all(f.done() for f in futures)]:
+            del self.pending[client_id]
+        return sum(1 for futures in self.pending.values() for future in futures if not future.done())
+
+    def cancel(self, client_id: str):
+        """Cancel a session's loads that have not started yet."""
+        with self.lock:
+            for future in self.pending.pop(client_id, []):
+                future.cancel()
+
+    def prefetch(self, client_id: str, course_code: str, sections: List[Tuple[str, str]]):
+        """Queue loads of (unit_id, section_id) pairs for a session, replacing its queued loads."""
+        self.cancel(client_id)
+        with self.lock:
+            futures = []
+            for unit_id, section_id in sections:
+                if self._pending_count() + len(futures) >= self.max_pending:
+                    break
+                futures.append(self.executor.submit(self._load, course_code, unit_id, section_id))
+            if futures:
+                self.pending[client_id] = futures
@@ -1,9 +1,12 @@
 import streamlit as st
 from utils.data.course_manager import CourseManager, Unit, Section
 from utils.data.user_manager import UserManager
-from utils.data.aws import get_file_content
+from utils.data.aws import get_file_content, get_user_courses
 from utils.frontend.styling import load_style
 from utils.core.memory_manager import initialize_memory_and_heartbeat, update_session_activity
+from utils.core.session_budget import enforce_session_budget
+from utils.data.cache_backend import sync_cache_generation
+from utils.ai.moderation_queue import show_moderation_notices, get_moderation_queue
 from utils.frontend.check_window import on_mobile
 
 class SessionManager:
@@ -78,7 +81,7 @@ class SessionManager:
         """Clear course-related session state"""
         keys_to_remove = [
             'course_code', 'course_name', 'course_description',
-            'grade_level', 'course_units'
+            'grade_level', 'course_units', 'course_version'
         ]
         for key in keys_to_remove:
             if key in st.session_state:
@@ -107,6 +110,12 @@ class SessionManager:
             SessionManager.clear_unit_context()
             SessionManager.clear_course_context()
         
+        # Drop cached data invalidated by other worker processes
+        sync_cache_generation()
+
+        # Start the moderation queue with the process, so sections left pending by a restart are reviewed
+        get_moderation_queue()
+
         # Load styling
         load_style()
         
@@ -124,6 +133,12 @@ class SessionManager:
 
         # Update activity on any user interaction
         update_session_activity()
+
+        # Keep large session state entries within the per-session memory budget
+        enforce_session_budget()
+
+        # Report background moderation results for sections this user saved
+        show_moderation_notices()
         
         # Check if user is signed in
         if check_user:
@@ -137,6 +152,26 @@ class SessionManager:
         st.session_state['drop_file'] = False
         st.session_state['math_attachments'] = []
         st.session_state['model_loaded'] = False
+        st.session_state.pop('conversation_context', None)
+        st.session_state.pop('chat_summary', None)
+        st.session_state.pop('rotate_conversation', None)
+
+    @staticmethod
+    def get_pdf_content():
+        """Get the current section's PDF, reading it from the data cache if it was spilled"""
+        pdf_content = st.session_state.get('pdf_content')
+        section = st.session_state.get('section')
+        if pdf_content is None and section is not None and section.section_type == 'file':
+            return get_file_content(section.file_path)
+        return pdf_content
+
+    @staticmethod
+    def get_user_courses():
+        """Get the user's courses, reading them from the data cache if they were spilled"""
+        user_courses = st.session_state.get('user_courses')
+        if user_courses is None and st.session_state.get('user_email'):
+            return [CourseManager.get_course(course_code) for course_code in get_user_courses(st.session_state.user_email)]
+        return user_courses or []
 
     @staticmethod
     def get_open_courses():
@@ -0,0 +1,79 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from utils.core.config import open_config
+from utils.core.logger import logger
+from utils.data.aws import get_open_courses, get_top_courses, get_course_bundle, get_custom_assistants, get_file_content
+from utils.data.course_manager import CourseManager
+
+# Defaults (overridden by config/cache.yaml)
+WARM_TOP_COURSES = 20  # Most accessed courses preloaded at startup
+WARM_WORKERS = 4  # Concurrent loads while warming
+
+def _warm_course(course_code: str) -> dict:
+    """Load a course's bundle, sections, assistants and PDFs into the shared cache."""
+    result = {'course': course_code, 'pdfs': 0, 'ok': False}
+    bundle = get_course_bundle(course_code)
+    if not bundle:
+        return result
+    get_custom_assistants(course_code)
+    CourseManager.get_course(course_code)
+    for unit in bundle['units']:
+        for summary in unit['sections']:
+            # The same call a student's section load makes, so it hits the entries filled here
+            section = CourseManager.get_section(course_code, unit['id'], summary['id'])
+            if section and section.section_type == 'file' and section.file_path:
+                if get_file_content(section.file_path) is not None:
+                    result['pdfs'] += 1
+    result['ok'] = True
+    return result
+
+def warm_caches(top_n: Optional[int] = None, workers: Optional[int] = None) -> dict:
+    """
+    Preload the configuration, the open course listing and the most accessed courses
+    (bundles and PDFs) into the shared cache backend, so the first sessions after a
+    restart do not wait on AWS. Only useful with a backend shared between processes
+    (config/cache.yaml `backend: sqlite`), since this runs beside the app process.
+
+    Args:
+        top_n (int, optional): Number of courses to preload
+        workers (int, optional): Concurrent course loads
+
+    Returns:
+        dict: Duration in seconds and the number of courses and PDFs loaded
+    """
+    start = time.perf_counter()
+    config = open_config().get('cache', {})
+    top_n = config.get('warm_top_courses', WARM_TOP_COURSES) if top_n is None else top_n
+    workers = config.get('warm_workers', WARM_WORKERS) if workers is None else workers
+
+    open_courses = get_open_courses()
+    course_codes = get_top_courses(top_n)
+    if len(course_codes) < top_n:
+        # Without enough access history, fill up with open courses
+        for item in open_courses:
+            code = item.get('SK', '').replace('COURSE#', '')
+            if code and code not in course_codes and len(course_codes) < top_n:
+                course_codes.append(code)
+
+    def warm(course_code):
+        try:
+            return _warm_course(course_code)
+        except Exception as e:
+            logger.warning(f"Warming course {course_code} failed: {e}")
+            return {'course': course_code, 'pdfs': 0, 'ok': False}
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix='cache-warmer') as executor:
+        results = list(executor.map(warm, course_codes))
+
+    report = {
+        'duration': time.perf_counter() - start,
+        'open_courses': len(open_courses),
+        'courses': sum(r['ok'] for r in results),
+        'courses_requested': len(course_codes),
+        'pdfs': sum(r['pdfs'] for r in results)
+    }
+    logger.info(f"Cache warmed in {report['duration']:.1f}s: {report['courses']}/{report['courses_requested']} courses, "
+                f"{report['pdfs']} PDFs, {report['open_courses']} open courses listed")
+    return report
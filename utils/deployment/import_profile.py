@@ -0,0 +1,94 @@
+import os
+import re
+import sys
+import ast
+import time
+import argparse
+import subprocess
+from dataclasses import dataclass
+from typing import List, Optional
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+IMPORT_TIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)')
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_ms: float
+    cumulative_ms: float
+    depth: int
+
+def page_modules(app_dir: str = APP_DIR) -> List[str]:
+    """Modules imported at the top level of app.py and the pages, in first-import order."""
+    paths = [os.path.join(app_dir, 'app.py')]
+    pages_dir = os.path.join(app_dir, 'pages')
+    paths += sorted(os.path.join(pages_dir, name) for name in os.listdir(pages_dir) if name.endswith('.py'))
+    modules = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), path)
+        for node in tree.body:
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            else:
+                continue
+            modules.extend(name for name in names if name not in modules)
+    return modules
+
+def profile_imports(modules: List[str], python: Optional[str] = None, app_dir: str = APP_DIR):
+    """
+    Import modules in a fresh interpreter with -X importtime.
+
+    Returns:
+        tuple: (list of ImportTiming for every module loaded, wall time in seconds, modules that failed to import)
+    """
+    script = 'import sys\n' + ''.join(
+        f"try:\n    import {module}\nexcept Exception as e:\n    print('FAILED {module}', file=sys.stderr)\n"
+        for module in modules)
+    start = time.perf_counter()
+    result = subprocess.run([python or sys.executable, '-X', 'importtime', '-c', script],
+                            cwd=app_dir, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+
+    timings, failed = [], []
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            timings.append(ImportTiming(module, int(self_us) / 1000, int(cumulative_us) / 1000, len(indent) // 2))
+        elif line.startswith('FAILED '):
+            failed.append(line[len('FAILED '):])
+    return timings, wall, failed
+
+def report(timings: List[ImportTiming], wall: float, failed: List[str], requested: List[str], top: int = 25) -> str:
+    """Format the slowest modules and the cost of each requested module."""
+    # Failed modules only logged partial timings, so they are reported as failed only
+    timings = [t for t in timings if t.module not in failed]
+    by_name = {t.module: t for t in timings}
+    lines = [f"Imported {len(timings)} modules in {wall:.2f}s (interpreter start-up included)", '',
+             "Requested modules (cumulative, excluding modules already loaded by earlier ones):"]
+    for module in requested:
+        timing = by_name.get(module)
+        cost = '     (failed)' if module in failed else f"{timing.cumulative_ms:9.1f} ms" if timing else '   (already loaded)'
+        lines.append(f"  {cost}  {module}")
+    lines += ['', f"Slowest {top} modules by cumulative time:"]
+    for timing in sorted(timings, key=lambda t: t.cumulative_ms, reverse=True)[:top]:
+        lines.append(f"  {timing.cumulative_ms:9.1f} ms  {timing.self_ms:8.1f} ms self  {timing.module}")
+    if failed:
+        lines += ['', "Failed to import: " + ', '.join(failed)]
+    return '\n'.join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time profile of the app's page dependencies, as on a cold start.")
+    parser.add_argument('--top', type=int, default=25, help="Number of slowest modules to list")
+    parser.add_argument('modules', nargs='*', help="Modules to profile (default: everything the pages import)")
+    args = parser.parse_args()
+
+    modules = args.modules or page_modules()
+    timings, wall, failed = profile_imports(modules)
+    print(report(timings, wall, failed, modules, args.top))
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,115 @@
 import requests
 import os
 import sys
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-import utils.data.aws
-import utils.frontend.check_window
-import utils.core.config
-import utils.frontend.clipboard
-import utils.frontend.display_courses
-import utils.frontend.display_units
-import utils.core.emailing
-import utils.core.logger
-import utils.core.memory_manager
-import utils.frontend.menu
-import utils.deployment.modify_index
-import utils.frontend.playlab
-import utils.data.user_manager
-import utils.frontend.styling
-import utils.deployment.warmup
+from utils.deployment.cache_warmer import warm_caches
+
+# Constants
+HEALTH_TIMEOUT = 180  # Seconds to wait for the Streamlit server to come up
+HEALTH_INTERVAL = 0.5  # Seconds between health checks
+PAGE_TIMEOUT = 60  # Seconds a page may take to run
+APP_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def page_names():
+    """URL names of the app's pages: '' for app.py, then the files in pages/."""
+    pages_dir = os.path.join(APP_DIR, 'pages')
+    return [''] + sorted(name[:-3] for name in os.listdir(pages_dir) if name.endswith('.py'))
+
+def wait_until_healthy(base_url, timeout=HEALTH_TIMEOUT):
+    """
+    Poll Streamlit's health endpoint until the server answers.
+
+    Returns:
+        bool: True once the server is healthy, False if it did not come up in time
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            response = requests.get(f"{base_url}/_stcore/health", timeout=2)
+            if response.status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(HEALTH_INTERVAL)
+    return False
+
+async def _run_page(ws_url, page_name, timeout):
+    """Open a session like a browser would and run one page script to the end."""
+    from tornado.websocket import websocket_connect
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+    connection = await asyncio.wait_for(websocket_connect(ws_url, subprotocols=['streamlit']), timeout)
+    try:
+        message = BackMsg()
+        message.rerun_script.query_string = ''
+        message.rerun_script.page_name = page_name
+        await connection.write_message(message.SerializeToString(), binary=True)
+        deadline = time.monotonic() + timeout
+        while True:
+            data = await asyncio.wait_for(connection.read_message(), max(deadline - time.monotonic(), 0))
+            if data is None:
+                raise ConnectionError("Session closed before the page finished")
+            forward = ForwardMsg.FromString(data)
+            # A page that switches to another page finishes early and the next one runs
+            if (forward.WhichOneof('type') == 'script_finished'
+                    and forward.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN):
+                return forward.script_finished == ForwardMsg.FINISHED_SUCCESSFULLY
+    finally:
+        connection.close()
+
+def exercise_pages(base_url, pages=None, timeout=PAGE_TIMEOUT):
+    """
+    Run each page once, so its imports and first render happen before a student's session.
+
+    Returns:
+        dict: Page name to seconds taken, or None if the page failed
+    """
+    ws_url = base_url.replace('http', 'ws', 1) + '/_stcore/stream'
+    timings = {}
+    for page_name in page_names() if pages is None else pages:
+        start = time.perf_counter()
+        try:
+            ok = asyncio.run(_run_page(ws_url, page_name, timeout))
+            timings[page_name] = time.perf_counter() - start if ok else None
+        except Exception as e:
+            print(f"Warm-up of page '{page_name or 'app'}' failed: {type(e).__name__}: {e}")
+            timings[page_name] = None
+    return timings
 
 def warm_start(try_url=True):
-    if try_url:
-        port = os.environ.get("PORT", "8501")
-        url = f"http://localhost:{port}"
-        print(f'Trying to warm up {url}')
+    """
+    Prepare a freshly started app process: prefill the data caches and, once the server
+    reports healthy, run every page once. Prints the time to ready.
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # The shared caches do not need the server, so they fill while it starts
+        caches = executor.submit(warm_caches)
+
+        if try_url:
+            port = os.environ.get("PORT", "8501")
+            base_url = f"http://localhost:{port}"
+            print(f'Waiting for {base_url} to become healthy')
+            if wait_until_healthy(base_url):
+                healthy = time.perf_counter() - start
+                print(f"Server healthy after {healthy:.1f}s")
+                timings = exercise_pages(base_url)
+                warmed = [name for name, seconds in timings.items() if seconds is not None]
+                print(f"Warmed {len(warmed)}/{len(timings)} pages: " +
+                      ', '.join(f"{name or 'app'} {seconds:.1f}s" for name, seconds in timings.items() if seconds is not None))
+            else:
+                print(f"Server not healthy after {HEALTH_TIMEOUT}s, skipping page warm-up")
 
         try:
-            response = requests.get(url)
-            print("Warm-up successful:", response.status_code)
+            caches.result()
         except Exception as e:
-            print("Warm-up failed:", e)
+            print("Cache warm-up failed:", e)
+    print(f"Ready after {time.perf_counter() - start:.1f}s")
 
 if __name__ == "__main__":
-    warm_start()
\ No newline at end of file
+    warm_start()
@@ -1,4 +1,5 @@
 import re
+from functools import lru_cache
 import docx
 from docx.shared import Inches
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
@@ -261,9 +262,11 @@ mml2omml_string = '''<xsl:stylesheet xmlns:xsl="http://www.w3.org/1999/XSL/Trans
 
 </xsl:stylesheet>'''
 
-# Parse the XSLT string
-xslt = etree.XML(mml2omml_string.encode('utf-8'))
-transform = etree.XSLT(xslt)
+@lru_cache(maxsize=1)
+def mml2omml_transform():
+    """The MathML to OMML transform, compiled on first use."""
+    xslt = etree.XML(mml2omml_string.encode('utf-8'))
+    return etree.XSLT(xslt)
 
 def latex_to_mathml(latex):
     mathml = _latex_to_mathml(latex)
@@ -283,7 +286,7 @@ def latex(doc, equation, centered=False, paragraph=None):
 
     # Transform MathML to OMML
     mathml_tree = etree.fromstring(mathml)
-    omml_tree = transform(mathml_tree)
+    omml_tree = mml2omml_transform()(mathml_tree)
 
     # Create a new paragraph and append the OMML content
     paragraph._element.append(omml_tree.getroot())
@@ -2,7 +2,6 @@ import os
 import tempfile
 import zipfile
 from utils.data.aws import get_course_details, get_course_units, get_unit_sections, s3, bucket_name
-from utils.documents.docx import markdownToWordFromString
 from utils.core.logger import logger
 
 def export_course(course_code, course_name):
@@ -17,6 +16,9 @@ def export_course(course_code, course_name):
     Returns:
         str: The path to the created zip file
     """
+    # The Word export stack is heavy, so it is only imported when a course is exported
+    from utils.documents.docx import markdownToWordFromString
+
     # Create a temporary file for the zip
     temp_zip = tempfile.NamedTemporaryFile(delete=False, suffix='.zip')
     temp_zip.close()  # Close the file handle before using it with ZipFile
@@ -1,7 +1,7 @@
 import streamlit as st
 from streamlit_lexical import streamlit_lexical
 from utils.data.aws import create_custom_assistant, get_custom_assistants, delete_custom_assistant
-from utils.core.config import open_config
+from utils.core.config import playlab_config
 from utils.core.error_handling import catch_error
 
 @st.dialog("Add New Assistant", width='large')
@@ -14,7 +14,7 @@ def add_assistant_dialog(course_code, custom_assistants):
     assistant_name = st.text_input("Assistant Name", label_visibility='collapsed', placeholder="e.g. Assignment Helper")
     st.markdown("#### Assistant Instructions")
     assistant_instructions = streamlit_lexical(
-        value=open_config()['playlab']['student_assistant_default_system_prompt'],
+        value=playlab_config().default_system_prompt,
         key='assistant_instructions',
         height=400,
         overwrite=True,
@@ -161,13 +161,13 @@ def get_assistant_instructions(course_code, section):
     
     # Handle None case first
     if assistant_id is None:
-        return open_config()['playlab']['student_assistant_default_system_prompt']
+        return playlab_config().default_system_prompt
     
     # Handle specific assistant IDs
     if assistant_id == "None":
         return None
     elif assistant_id == "Default":
-        return open_config()['playlab']['student_assistant_default_system_prompt']
+        return playlab_config().default_system_prompt
     else:
         # Get instructions from custom assistant
         custom_assistants = get_custom_assistants(course_code)
@@ -175,4 +175,4 @@ def get_assistant_instructions(course_code, section):
             if assistant['assistant_id'] == assistant_id:
                 return assistant['instructions']
         # Fallback to default if assistant not found
-        return open_config()['playlab']['student_assistant_default_system_prompt']
\ No newline at end of file
+        return playlab_config().default_system_prompt
\ No newline at end of file
@@ -88,11 +88,12 @@ def display_courses(allow_edit=False, allow_copy=False):
     Display courses with various interaction options
     """
 
-    if not st.session_state.user_courses:
+    user_courses = sm.get_user_courses()
+    if not user_courses:
         st.info("No courses found. Create your first course!")
         return
     
-    for course in st.session_state.user_courses:
+    for course in user_courses:
         course_code = course.code
         with st.container():
             st.markdown(f"### **{course.name}**")
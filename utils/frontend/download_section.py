@@ -1,7 +1,7 @@
 import tempfile
 import os
 import streamlit as st
-from utils.documents.docx import markdownToWordFromString
+from utils.data.session_manager import SessionManager as sm
 
 # Download Dialog
 @st.dialog("Download Section")
@@ -12,6 +12,8 @@ def download_dialog(section_type, section_title, content=None, file_path=None):
     if not st.session_state.download_complete:
         if section_type == 'content':
             with st.spinner("Preparing document..."):
+                # The Word export stack is heavy, so it is only imported when a document is built
+                from utils.documents.docx import markdownToWordFromString
                 # Create a temporary file for the DOCX
                 with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as tmp_file:
                     markdownToWordFromString(content, tmp_file.name)
@@ -29,10 +31,11 @@ def download_dialog(section_type, section_title, content=None, file_path=None):
                     )
         elif section_type == 'file' and file_path:
             with st.spinner("Preparing PDF..."):
-                if st.session_state['pdf_content']:
+                pdf_content = sm.get_pdf_content()
+                if pdf_content:
                     st.download_button(
                         label="Download PDF",
-                        data=st.session_state['pdf_content'],
+                        data=pdf_content,
                         file_name=os.path.basename(file_path),
                         mime="application/pdf",
                         use_container_width=True,
@@ -35,6 +35,8 @@ def student_menu():
                 st.markdown(f'#### Unit {unit.order}')
                 with st.expander(f"**{unit.title}**"):
                     for section in unit.sections:
+                        if section.moderation_status == 'rejected':
+                            continue
                         if st.button(
                             f"{section.title}", 
                             key=f"section_{unit.id}_{section.id}",
@@ -1,37 +1,47 @@
 import streamlit as st
+import json
+import time
+from functools import lru_cache
+import requests
 from st_equation_editor import mathfield
 import tempfile
-from playlab_api import PlaylabApp
-import time
 from utils.data.session_manager import SessionManager as sm
 from utils.frontend.styling import button_style
 from utils.core.logger import logger
 from tempfile import NamedTemporaryFile
 import os
 from utils.core.error_handling import catch_error
-from utils.core.config import open_config
-import traceback
+from utils.ai.playlab_pool import get_playlab_pool
+from utils.ai.streaming import DeadlineExceeded
+from utils.ai.resilience import guarded_call, backoff_delay, CircuitOpenError
+from utils.ai.scheduler import scheduled_stream, QueueTimeout, PRIORITY_TEACHER, PRIORITY_STUDENT
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from utils.ai.response_parser import ResponseParser, stream_field, parse_response
+from utils.ai.context import get_conversation_context
+from utils.ai.payload import PromptContext
+from utils.ai.telemetry import get_telemetry, CallRecord
+from utils.ai.moderation import moderation_prompt
+from utils.ai.attachments import get_attachment_text
+from utils.ai.history import history_limits, history_summary, history_transcript, fold_history
 
 custom_button = button_style()
 
 # Load model
 def load_model(project_id):
     try:
-        app = PlaylabApp(project_id=project_id, verbose=False)
-        return app
+        return get_playlab_pool().acquire(project_id)
     except Exception as e:
         return None
 
-# Function to stream text letter by letter
-def stream_text(text):
-    sentence = ""
-    for letter in text:
-        sentence += letter
-        yield sentence
+# Markdown special characters that need escaping
+MARKDOWN_ESCAPES = str.maketrans({char: '\\' + char for char in '\\`*_{}[]()#+-.!|>~^'})
+RENDER_CACHE_SIZE = 512  # Escaped messages kept per process
 
+@lru_cache(maxsize=RENDER_CACHE_SIZE)
 def escape_markdown(text: str) -> str:
     """
     Escapes markdown special characters in text to prevent markdown formatting.
+    Results are cached, so messages already in the transcript are not escaped again on reruns.
     
     Args:
         text (str): The text to escape
@@ -39,10 +49,6 @@ def escape_markdown(text: str) -> str:
     Returns:
         str: Text with markdown special characters escaped
     """
-    # List of markdown special characters that need escaping
-    markdown_chars = ['\\', '`', '*', '_', '{', '}', '[', ']', '(', ')', '#', '+', 
-                     '-', '.', '!', '|', '>', '~', '^']
-    
     add_math = False
     if '\n\n#### Math Attachments:\n\n' in text:
         add_math = True
@@ -52,8 +58,7 @@ def escape_markdown(text: str) -> str:
     else:    
        escaped_text = text
 
-    for char in markdown_chars:
-        escaped_text = escaped_text.replace(char, '\\' + char)
+    escaped_text = escaped_text.translate(MARKDOWN_ESCAPES)
 
     if add_math:
         escaped_text = escaped_text + '\n\n#### Math Attachments:\n\n' + math_attachments
@@ -80,58 +85,112 @@ def equation_editor(on_mobile):
             st.session_state.math_attachments.append(tex)
         st.rerun()
 
-def message_fn(message, role='student', section_title='', section_type='content', json=False):
+@st.fragment
+def chat_controls(math_input=False, on_mobile=False):
+    """Attach, reset and calculator buttons, and the file uploader."""
+    # Organize buttons based on screen size
+    if on_mobile:
+        #custom_columns()
+        col1, col2, col3 = st.columns((1, 1, 1))
+    else:
+        col1, col2, col3 = st.columns((1, 1, 1))
+
+    # File upload button
+    with col1:
+        custom_button()
+        if st.button("📎", help="Attach file"):
+            st.session_state.drop_file = True
+
+    # Reset chat button
+    with col2:
+        custom_button()
+        if st.button("🔄", use_container_width=False, help="Reset chat"):
+            sm.reset_chatbot()
+            st.rerun()
+        
+    # Calculator button
+    if math_input:
+        with col3:
+            custom_button()
+            if st.button("![Calculator](https://raw.githubusercontent.com/teaghan/ai-tutors/main/images/calculator.png)",
+                        help="Type an equation"):
+                equation_editor(on_mobile)
+
+    if st.session_state.drop_file:
+        # File uploader
+        st.file_uploader("File Uploader",
+                    help="Attach a file to your message", 
+                    label_visibility='collapsed',
+                    accept_multiple_files=False, 
+                    type=["pdf", "docx", "pptx", "png", "jpg", "csv", "txt", "xlsx", "tsv", "gif", "webp"],
+                    key=f"file_upload_{st.session_state.file_upload_key}")
+
+@st.fragment
+def math_attachments_list():
+    """Math attachments of the next message, each with a remove button."""
+    if st.session_state.math_attachments:
+        st.markdown("#### Math Attachments:")
+        for i, attachment in enumerate(st.session_state.math_attachments):
+            col1, col2 = st.columns([1, 8])
+            with col2:
+                st.markdown(f'**Expression {i+1}:**  ${attachment}$')
+            with col1:
+                if st.button("Remove", key=f"delete_math_{i}", 
+                            use_container_width=False):
+                    st.session_state.math_attachments.pop(i)
+                    st.rerun(scope='fragment')
+
+def prompt_context(role='student', section_title='', section_type='content') -> PromptContext:
+    """Fields of the current section that are sent unchanged with every full message."""
+    state = st.session_state
+    fields = (
+        ('course_name', state.get('course_name', '')),
+        ('student_grade', state.get('grade_level', '')),
+        ('unit_title', state.section.unit_title),
+        ('module_title', section_title)
+    )
+    if role == 'student':
+        if section_type != 'file':
+            fields += (('content', state.section.content),)
+        fields += (('teacher_instructions', state.section.assistant_instructions),)
+    return PromptContext(fields)
+
+def message_fn(message, role='student', section_title='', section_type='content', as_json=False, history='', document='',
+               new_conversation=False):
     if role == 'teacher':
-        message = f'''{{
-        "message": """{message}""",
-        "course_name": """{st.session_state.get('course_name', '')}""",
-        "student_grade": """{st.session_state.get('grade_level', '')}""",
-        "unit_title": """{st.session_state.section.unit_title}""",
-        "module_title": """{section_title}""",
-        "content": """{st.session_state.get("editor_content", "")}""",
-        "template_content": """{st.session_state.get("template_content", "")}"""
-    }}'''
+        # Large blocks are sent in full once per conversation, then as diffs or references
+        context = get_conversation_context(st.session_state.ai_app)
+        content = context.render('content', st.session_state.get("editor_content", ""))
+        template_content = context.render('template_content', st.session_state.get("template_content", ""))
+        message = prompt_context(role, section_title, section_type).build(
+            message, (('content', content), ('template_content', template_content)))
     elif role == 'moderator':
-        message = f'''{{
-        "course_name": """{st.session_state.get('course_name', '')}""",
-        "student_grade": """{st.session_state.get('grade_level', '')}""",
-        "unit_title": """{st.session_state.section.unit_title}""",
-        "module_title": """{section_title}""",
-        "content": """{message}""",
-    }}'''
+        message = moderation_prompt(message, section_title, st.session_state.get('course_name', ''),
+                                    st.session_state.get('grade_level', ''), st.session_state.section.unit_title)
     
     elif role == 'student':
-        if len(st.session_state.messages) > 2:
-            message = f'''{{
-            "message": """{message}"""
-            }}'''
+        if len(st.session_state.messages) > 2 and not history and not new_conversation:
+            message = PromptContext().build(message)
         else:
-            if section_type == 'file':
-                message = f'''{{
-                "message": """{message}""",
-                "student_grade": """{st.session_state.get('grade_level', '')}""",
-                "course_name": """{st.session_state.get('course_name', '')}""",
-                "unit_title": """{st.session_state.section.unit_title}""",
-                "module_title": """{section_title}""",
-                "teacher_instructions": """{st.session_state.section.assistant_instructions}"""
-                }}'''
-            else:
-                message = f'''{{
-                "message": """{message}""",
-                "student_grade": """{st.session_state.get('grade_level', '')}""",
-                "course_name": """{st.session_state.get('course_name', '')}""",
-                "unit_title": """{st.session_state.section.unit_title}""",
-                "module_title": """{section_title}""",
-                "content": """{st.session_state.section.content}""",
-                "teacher_instructions": """{st.session_state.section.assistant_instructions}"""
-                }}'''
-    if json:
+            # First message of a conversation, or of one restarted from a summary of the chat so far
+            dynamic = ()
+            if history:
+                dynamic += (('conversation_so_far', history),)
+            if document:
+                # Text of the section's PDF, sent instead of uploading the file
+                dynamic += (('file_content', document),)
+            message = prompt_context(role, section_title, section_type).build(message, dynamic)
+    if as_json:
         return json.dumps(message)
     return message
 
 def response_fn(response, role='student'):
     if role == 'teacher':
+        # The assistant has seen this exchange, including any content it wrote
+        context = get_conversation_context(st.session_state.ai_app)
+        context.commit()
         if 'content' in response:
+            context.mark_seen('content', response['content'])
             st.session_state['editor_content'] = response['content']
             st.session_state['update_editor'] = True
 
@@ -147,29 +206,7 @@ def parse_ai_response(text: str, keys=['message', 'content']) -> dict:
     Returns:
         dict: Dictionary with 'message' and/or 'content' keys and their corresponding values
     """
-    result = {}
-    
-    for key in keys:
-        key_with_quotes = f'"{key}":'
-        if key_with_quotes in text:
-            # Find the start position after the key
-            start_idx = text.index(key_with_quotes) + len(key_with_quotes)
-            
-            # Skip whitespace to find the triple quote
-            while start_idx < len(text) and text[start_idx].isspace():
-                start_idx += 1
-            
-            # Skip the opening triple quote
-            if text.startswith('"""', start_idx):
-                start_idx += 3
-                
-                # Find the closing triple quote
-                end_idx = text.find('"""', start_idx)
-                if end_idx != -1:
-                    value = text[start_idx:end_idx]
-                    result[key] = value
-    
-    return result
+    return parse_response(text, keys)
 
 # Display conversation
 def display_conversation(project_id, user='student', section_title='', section_type='content', max_retries=3):
@@ -202,7 +239,13 @@ def display_conversation(project_id, user='student', section_title='', section_t
         st.session_state.model_loaded = True
 
     if len(st.session_state.messages)>0:
-        for msg in st.session_state.messages:
+        # Only the most recent messages are rendered; older ones are collapsed into a summary
+        window, _ = history_limits()
+        summary = history_summary(st.session_state, window)
+        if summary:
+            with st.expander(f"Earlier in this conversation ({len(summary)} messages)", expanded=False):
+                st.text('\n'.join(summary))
+        for msg in st.session_state.messages[-window:]:
             if msg["role"] == "user":
                 st.chat_message(msg["role"], avatar=avatar[msg["role"]]).markdown(escape_markdown(rf"{msg["content"]}"))
             else:
@@ -213,44 +256,9 @@ def display_conversation(project_id, user='student', section_title='', section_t
 
     on_mobile = st.session_state.get('on_mobile', False)
 
-    # Organize buttons based on screen size
-    if on_mobile:
-        #custom_columns()
-        col1, col2, col3 = st.columns((1, 1, 1))
-    else:
-        col1, col2, col3 = st.columns((1, 1, 1))
-
-    # File upload button
-    with col1:
-        custom_button()
-        if st.button("📎", help="Attach file"):
-            st.session_state.drop_file = True
-
-    # Reset chat button
-    with col2:
-        custom_button()
-        if st.button("🔄", use_container_width=False, help="Reset chat"):
-            sm.reset_chatbot()
-            st.rerun()
-        
-    # Calculator button
-    if math_input:
-        with col3:
-            custom_button()
-            if st.button("![Calculator](https://raw.githubusercontent.com/teaghan/ai-tutors/main/images/calculator.png)",
-                        help="Type an equation"):
-                equation_editor(on_mobile)
+    # The controls rerun on their own, so using them does not re-render the transcript
+    chat_controls(math_input, on_mobile)
 
-    if st.session_state.drop_file:
-        # File uploader
-        dropped_files = st.file_uploader("File Uploader",
-                    help="Attach a file to your message", 
-                    label_visibility='collapsed',
-                    accept_multiple_files=False, 
-                    type=["pdf", "docx", "pptx", "png", "jpg", "csv", "txt", "xlsx", "tsv", "gif", "webp"],
-                    key=f"file_upload_{st.session_state.file_upload_key}")
-    else:
-        dropped_files = []
     # Create a container for both audio and chat input
     input_container = st.container()
 
@@ -260,17 +268,12 @@ def display_conversation(project_id, user='student', section_title='', section_t
         prompt = st.chat_input(key='chat_input_text')
 
         # Display math attachments
-        if st.session_state.math_attachments:
-            st.markdown("#### Math Attachments:")
-            for i, attachment in enumerate(st.session_state.math_attachments):
-                col1, col2 = st.columns([1, 8])
-                with col2:
-                    st.markdown(f'**Expression {i+1}:**  ${attachment}$')
-                with col1:
-                    if st.button("Remove", key=f"delete_math_{i}", 
-                                use_container_width=False):
-                        st.session_state.math_attachments.pop(i)
-                        st.rerun()
+        math_attachments_list()
+
+    # The uploader lives in the controls fragment; its file is read from the session state
+    dropped_files = None
+    if st.session_state.drop_file:
+        dropped_files = st.session_state.get(f"file_upload_{st.session_state.file_upload_key}")
 
     response = {'message': ''}
     if prompt:
@@ -305,20 +308,53 @@ def display_conversation(project_id, user='student', section_title='', section_t
                 prompt += f'Expression {i+1}: ${attachment}$\n\n'
             st.session_state.math_attachments = []
 
-        if section_type == 'file' and len(st.session_state.messages) < 2:
+        # Restart the Playlab conversation once the chat history has been folded,
+        # seeding the new conversation with the summary instead of the full history
+        rotated = False
+        if st.session_state.get('rotate_conversation'):
+            st.session_state.rotate_conversation = False
+            new_app = load_model(project_id) if user == 'student' else None
+            if new_app is not None:
+                st.session_state.ai_app = new_app
+                rotated = True
+
+        document = ''
+        if section_type == 'file' and (len(st.session_state.messages) < 2 or rotated):
+            # The PDF's text is extracted once per document version and sent with the user's message
+            with st.session_state.chat_spinner, st.spinner(f"Reading the PDF..."):
+                try:
+                    document = get_attachment_text(st.session_state.section.file_path) or ''
+                except Exception as e:
+                    logger.error(f"Error reading attachment text: {str(e)}")
+
+        if section_type == 'file' and (len(st.session_state.messages) < 2 or rotated) and not document:
+            # No extractable text: upload the PDF itself
             first_message = "Here is the file I am looking at, please let me know when you are ready to start."
-            first_message = message_fn(first_message, user, section_title, section_type)
-            logger.info(f'DEFAULT FIRST MESSAGE:\n\n{first_message}\n\n')
+            # Opens the conversation (a rotated one too), so it carries the section's context
+            first_message = message_fn(first_message, user, section_title, section_type, new_conversation=True)
+            logger.debug('DEFAULT FIRST MESSAGE:\n\n%s\n\n', first_message)
             with st.session_state.chat_spinner, st.spinner(f"Reading the PDF..."):
                 # Load pdf to temporary file
                 try:
                     # Get PDF content from S3
-                    if st.session_state['pdf_content']:
+                    pdf_content = sm.get_pdf_content()
+                    if pdf_content:
                         # Create a temporary file
                         with tempfile.NamedTemporaryFile(delete=True, suffix='.pdf') as tmp_file:
-                            tmp_file.write(st.session_state['pdf_content'])
+                            tmp_file.write(pdf_content)
                             tmp_path = tmp_file.name
-                            _ = st.session_state.ai_app.send_message(first_message, file_path=tmp_path)
+                            upload = CallRecord(project_id, user, request_bytes=len(pdf_content))
+                            upload_start = time.perf_counter()
+                            try:
+                                result = guarded_call(project_id, st.session_state.ai_app.send_message, first_message, file_path=tmp_path)
+                                upload.parsed = True
+                                upload.response_bytes = len(str(result).encode('utf-8'))
+                            except Exception as e:
+                                upload.error = type(e).__name__
+                                raise
+                            finally:
+                                upload.latency = time.perf_counter() - upload_start
+                                get_telemetry().record(upload)
                 except Exception as e:
                     logger.error(f"Error loading file: {str(e)}")
                     st.exception(e)
@@ -329,18 +365,60 @@ def display_conversation(project_id, user='student', section_title='', section_t
             st.chat_message("user", avatar=avatar["user"]).markdown(escape_markdown(prompt))
 
         # Get the response from the tutor
-        prompt = message_fn(prompt, user, section_title, section_type)
-
+        history = history_transcript(st.session_state) if rotated else ''
+        prompt = message_fn(prompt, user, section_title, section_type, history=history, document=document)
+        original_prompt = prompt
+
+        # Requests wait their turn in the process-wide queue; teachers go before students
+        priority = PRIORITY_TEACHER if user == 'teacher' else PRIORITY_STUDENT
+        ctx = get_script_run_ctx()
+        client_id = ctx.session_id if ctx else ''
+        queue_status = st.session_state.chat_spinner.empty()
+        def show_position(ahead):
+            queue_status.caption(f"Waiting for the assistant... {ahead} request{'s' if ahead != 1 else ''} ahead of you")
+
+        call = CallRecord(project_id, user)
+        call_start = time.perf_counter()
         retries = 0
         while retries < max_retries:
             with st.session_state.chat_spinner, st.spinner(f"Thinking..."):
                 try:
-                    logger.info(f'PROMPT:\n\n{prompt}\n\n')
-                    response = st.session_state.ai_app.send_message(prompt, file_path=file_path)
-                    logger.info(fr'RESPONSE: {response['content']}')
-                    response = parse_ai_response(response['content'])
-                    logger.info(fr'PARSED RESPONSE: {response}')
-                except:
+                    logger.debug('PROMPT:\n\n%s\n\n', prompt)
+                    # Stream the message field into the chat as the response arrives,
+                    # abandoning the response as soon as it stops following the protocol
+                    parser = ResponseParser(stream_key='message')
+                    stats = {}
+                    deltas = scheduled_stream(st.session_state.ai_app, prompt, file_path=file_path, priority=priority,
+                                              client_id=client_id, on_position=show_position, stats=stats)
+                    with next_assistant_message.chat_message("assistant", avatar=avatar["assistant"]):
+                        st.write_stream(stream_field(deltas, parser))
+                    call.attempt(prompt, parser.text, stats)
+                    call.error = ''
+                    call.parsed = not parser.malformed
+                    logger.debug('RESPONSE: %s', parser.text)
+                    if parser.malformed:
+                        logger.warning(f'Malformed response: {parser.malformed}')
+                    # Fields completed before any malformed part are still used
+                    response = {key: parser.fields[key] for key in ['message', 'content'] if key in parser.fields}
+                    logger.debug('PARSED RESPONSE: %s', response)
+                except (CircuitOpenError, QueueTimeout) as e:
+                    # The API is failing or overloaded; don't wait on it
+                    logger.warning(str(e))
+                    call.error = type(e).__name__
+                    retries = max_retries
+                    break
+                except (requests.RequestException, DeadlineExceeded) as e:
+                    # The request failed: back off, then send the original message again
+                    logger.warning(f'Attempt {retries + 1} failed: {type(e).__name__}: {e}')
+                    call.attempt(prompt, '')
+                    call.error = type(e).__name__
+                    call.parsed = False
+                    retries += 1
+                    if retries < max_retries:
+                        time.sleep(backoff_delay(retries - 1))
+                    prompt = original_prompt
+                    continue
+                except Exception:
                     catch_error()
                 # Check if "message" key is present
                 if 'message' in response and response['message']:
@@ -349,9 +427,16 @@ def display_conversation(project_id, user='student', section_title='', section_t
                 prompt = 'There was an issue with the previous response. Perhaps the parsing was not able to interpret the response correctly. Please try again. Write your response to the user again.'
                 
         
+        queue_status.empty()
+        call.latency = time.perf_counter() - call_start
+        call.retries = retries
+        get_telemetry().record(call)
         # Set default error message if all retries failed
         if retries == max_retries:
+            # The assistant may not have received the context; send it in full next time
+            get_conversation_context(st.session_state.ai_app).reset()
             response['message'] = 'I am sorry, I am having trouble producing a response right now. Please try again later.'
+            next_assistant_message.chat_message("assistant", avatar=avatar["assistant"]).markdown(response['message'])
         # Clean up the temporary file after we're done with it
         if temp_file and os.path.exists(temp_file.name):
             try:
@@ -361,12 +446,7 @@ def display_conversation(project_id, user='student', section_title='', section_t
         
         st.session_state.messages.append({"role": "assistant", "content": rf"{response['message']}"})    
         st.session_state.email_sent = False
-        # Display the response letter by letter
-        with next_assistant_message.chat_message("assistant", avatar=avatar["assistant"]):
-            with st.empty():
-                for sentence in stream_text(response['message']):
-                    st.markdown(sentence)
-                    time.sleep(0.005)
+        fold_history(st.session_state)
 
         response_fn(response, user)
         st.rerun()
@@ -375,95 +455,3 @@ def display_conversation(project_id, user='student', section_title='', section_t
     #scroll_to('bottom')
 
     return response
-
-def moderate_content(section_title, section_type='content', max_retries=3, file_obj=None):
-    """
-    Moderates content for appropriateness using an AI model.
-    
-    Args:
-        section_title (str): Title of the section being moderated
-        section_type (str): Type of section ('content' or 'file')
-        max_retries (int): Maximum number of retries for failed attempts
-        file_obj (FileUpload, optional): File object to moderate for file sections
-        
-    Returns:
-        tuple: (bool, str) where bool indicates if content is appropriate,
-               and str contains feedback message or error details
-    """
-    try:
-        # Load the moderator model
-        config = open_config()
-        if 'playlab' not in config or 'section_moderator' not in config['playlab']:
-            return False, "Configuration error: Missing moderator settings"
-            
-        project_id = config['playlab']['section_moderator']
-        moderator_app = load_model(project_id)
-        if moderator_app is None:
-            return True, "AI moderation is currently unavailable due to API access issues. Please try again later."
-
-        # Ensure moderator spinner exists
-        if 'moderator_spinner' not in st.session_state:
-            st.session_state.moderator_spinner = st.container()
-
-        with st.session_state.moderator_spinner, st.spinner("Evaluating the section contents..."):
-            retries = 0
-            while retries < max_retries:
-                try:
-                    if section_type == 'file':
-                        # Read the file content
-                        file_content = file_obj.read()
-                        file_obj.seek(0)  # Reset file pointer for future reads
-                        
-                        # Create temporary file for PDF content
-                        with tempfile.NamedTemporaryFile(delete=True, suffix='.pdf') as tmp_file:
-                            tmp_file.write(file_content)
-                            tmp_file.flush()  # Ensure all data is written
-                            
-                            # Tell the moderator that content is in PDF
-                            content = "The content is attached as a PDF file to this message."
-                            prompt = message_fn(content, 'moderator', section_title, section_type)
-                            logger.info(f'MODERATOR PROMPT:\n\n{prompt}\n\n')
-                            
-                            # Send message with file path
-                            response = moderator_app.send_message(prompt, file_path=tmp_file.name)
-                    else:
-                        # Use the editor content
-                        content = st.session_state.get("editor_content", "")
-                        if not content.strip():
-                            return False, "Error: No content found to moderate"
-                            
-                        prompt = message_fn(content, 'moderator', section_title, section_type)
-                        logger.info(f'MODERATOR PROMPT:\n\n{prompt}\n\n')
-                        response = moderator_app.send_message(prompt)
-                        logger.info(f'MODERATOR RESPONSE:\n\n{response}\n\n')
-
-                    # Parse response looking for required fields
-                    parsed = parse_ai_response(response['content'], keys=['consideration', 'assessment', 'feedback'])
-                    logger.info(f'MODERATOR PARSED RESPONSE:\n\n{parsed}\n\n')
-                    if not parsed.get('assessment'):
-                        if retries == max_retries - 1:
-                            return False, "Error: Could not get clear assessment from moderator"
-                        retries += 1
-                        prompt = 'There was an issue with the previous response. Perhaps the parsing was not able to interpret the response correctly. Please try again. Write your response again.'
-                        continue
-
-                    is_inappropriate = 'inappropriate' in parsed['assessment'].lower()
-                    if is_inappropriate:
-                        feedback = parsed.get('feedback', 'Content was found to be inappropriate')
-                        return False, feedback
-                    return True, ""
-
-                except Exception as e:
-                    if retries == max_retries - 1:
-                        # print traceback
-                        traceback.print_exc()
-                        logger.error(f"Error in moderation attempt {retries + 1}: {str(e)}")
-                        return False, f"Error during moderation: {str(e)}"
-                    retries += 1
-                    prompt = 'There was an error processing the previous response. Please try again.'
-
-    except Exception as e:
-        logger.error(f"Critical error in content moderation: {str(e)}")
-        return False, f"Critical error during moderation: {str(e)}"
-    
-
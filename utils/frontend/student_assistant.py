@@ -1,7 +1,7 @@
 import streamlit as st
 from streamlit_extras.stylable_container import stylable_container
 from utils.frontend.playlab import display_conversation
-from utils.core.config import open_config
+from utils.core.config import playlab_config
 
 def display_student_assistant():
     pr_color = st.get_option('theme.primaryColor')
@@ -19,6 +19,6 @@ def display_student_assistant():
                         help="Ask AI about this section",
                         use_container_width=not st.session_state.on_mobile)
         with po:
-            display_conversation(open_config()['playlab']['student_assistant'], user='student', 
+            display_conversation(playlab_config().student_assistant, user='student', 
                                 section_title=st.session_state.section.title,
                                 section_type=st.session_state.section.section_type)
\ No newline at end of file
@@ -1,6 +1,4 @@
 from utils.deployment.warmup import warm_start
-import time
 
 if __name__ == "__main__":
-    time.sleep(20)
     warm_start()
\ No newline at end of file